@@ -0,0 +1,63 @@
+"""Compare the notebook's cleaning loop with playstore.cleaning.
+
+Rows are resampled from apps.csv up to each target size, then both cleaning
+paths are timed on the same frame and checked to give the same result.
+
+    python benchmarks/bench_cleaning.py --sizes 10000 1000000 10000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from playstore.cleaning import clean_apps, clean_apps_loop  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000]
+DEFAULT_CSV = os.path.join(os.path.dirname(__file__), '..', 'apps.csv')
+
+
+def scale_up(apps, n_rows, seed=0):
+    """Resample rows of apps with replacement until there are n_rows."""
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(apps), size=n_rows)
+    return apps.iloc[idx].reset_index(drop=True)
+
+
+def time_call(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--csv', default=DEFAULT_CSV)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--skip-loop-above', type=int, default=None,
+                        help='skip the slow loop baseline above this many rows')
+    args = parser.parse_args(argv)
+
+    apps = pd.read_csv(args.csv, dtype={'Installs': str, 'Price': str})
+    cols = ['Installs', 'Price']
+
+    print(f"{'rows':>12} {'loop (s)':>10} {'vectorized (s)':>15} {'speedup':>8}")
+    for n_rows in args.sizes:
+        frame = scale_up(apps, n_rows)
+        fast_time, fast = time_call(clean_apps, frame, columns=cols)
+        if args.skip_loop_above is not None and n_rows > args.skip_loop_above:
+            print(f'{n_rows:>12} {"-":>10} {fast_time:>15.3f} {"-":>8}')
+            continue
+        loop_time, slow = time_call(clean_apps_loop, frame, cols_to_clean=cols)
+        pd.testing.assert_frame_equal(fast[cols], slow[cols], check_names=False)
+        print(f'{n_rows:>12} {loop_time:>10.3f} {fast_time:>15.3f} '
+              f'{loop_time / fast_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
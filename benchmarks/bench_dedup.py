@@ -0,0 +1,108 @@
+"""Compare drop_duplicates with playstore.dedup on synthetic apps data.
+
+Two cases are timed on each size, read back from CSV as the notebook does:
+
+* one frame: ``drop_duplicates()`` against ``deduplicate(normalize=False)``,
+  over every column and over the apps.csv columns without the index;
+* batches: the frame arrives in ``--batches`` parts, and each part is
+  deduplicated against everything before it, either by concatenating the
+  history and calling ``drop_duplicates`` again or with a FingerprintIndex.
+
+Both paths are checked to keep the same rows.
+
+    python benchmarks/bench_dedup.py --sizes 200000 2000000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from synthetic import synthetic_apps  # noqa: E402
+
+from playstore.dedup import FingerprintIndex, deduplicate  # noqa: E402
+
+DEFAULT_SIZES = [200_000, 2_000_000]
+DEFAULT_BATCHES = 10
+
+
+def time_call(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def read_back(n_rows):
+    """Synthetic apps written to CSV and read back with pd.read_csv."""
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'apps.csv')
+        synthetic_apps(n_rows).to_csv(path)
+        return pd.read_csv(path)
+    finally:
+        shutil.rmtree(directory)
+
+
+def batches_pandas(parts, key):
+    """Each part deduplicated against the concatenated earlier parts."""
+    seen = parts[0].iloc[:0]
+    kept = []
+    for part in parts:
+        combined = pd.concat([seen, part])
+        new = combined[~combined.duplicated(subset=key)].iloc[len(seen):]
+        kept.append(new)
+        seen = pd.concat([seen, new])
+    return pd.concat(kept)
+
+
+def batches_index(parts, key, directory):
+    """Each part deduplicated against a FingerprintIndex saved after every part."""
+    kept = []
+    for part in parts:
+        index = FingerprintIndex(directory, key=key, normalize=False)
+        kept.append(index.deduplicate(part))
+        index.save()
+    return pd.concat(kept)
+
+
+def report(label, baseline, fast):
+    print(f'  {label:<34} {baseline:>9.3f} {fast:>10.3f} {baseline / fast:>7.2f}x')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--batches', type=int, default=DEFAULT_BATCHES)
+    args = parser.parse_args(argv)
+
+    for n_rows in args.sizes:
+        raw = read_back(n_rows)
+        key = [col for col in raw.columns if col != 'Unnamed: 0']
+        print(f'{n_rows} rows{"":<22} {"pandas (s)":>9} {"playstore (s)":>10} {"speedup":>8}')
+
+        for label, subset in [('one frame, all columns', None), ('one frame, without index', key)]:
+            base_time, base = time_call(raw.drop_duplicates, subset=subset)
+            fast_time, fast = time_call(deduplicate, raw, key=subset, normalize=False)
+            assert base.index.equals(fast.index)
+            report(label, base_time, fast_time)
+
+        size = -(-len(raw) // args.batches)
+        parts = [raw.iloc[i:i + size] for i in range(0, len(raw), size)]
+        directory = tempfile.mkdtemp()
+        try:
+            base_time, base = time_call(batches_pandas, parts, key)
+            fast_time, fast = time_call(batches_index, parts, key, directory)
+        finally:
+            shutil.rmtree(directory)
+        assert base.index.equals(fast.index)
+        report(f'{len(parts)} batches, without index', base_time, fast_time)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""Load-test playstore.query with the notebook's questions.
+
+A QueryService is built from apps.csv (or a synthetic dataset, see
+synthetic.py) and the polarity of a reviews file: --reviews, the synthetic
+dataset's reviews, or synthetic reviews of the apps.csv apps written to the
+data directory. A fixed mix of queries is replayed through the in-process
+LocalClient or, with --http, through a local HTTP server. Latency
+percentiles are printed per operation.
+
+    python benchmarks/bench_queries.py --scale 100 --requests 20000
+    python benchmarks/bench_queries.py --http --threads 8
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from synthetic import REVIEWS_PER_SCALE, synthetic_reviews, write_dataset  # noqa: E402
+
+from playstore.cleaning import clean_apps  # noqa: E402
+from playstore.dedup import deduplicate  # noqa: E402
+from playstore.loading import load_apps  # noqa: E402
+from playstore.query import HTTPClient, LocalClient, QueryService, serve  # noqa: E402
+from playstore.reviews import stream_reviews  # noqa: E402
+from playstore.sketches import polarity_by_type  # noqa: E402
+
+DEFAULT_CSV = os.path.join(os.path.dirname(__file__), '..', 'apps.csv')
+DEFAULT_DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+POPULAR = ['GAME', 'FAMILY', 'PHOTOGRAPHY', 'MEDICAL', 'TOOLS', 'FINANCE',
+           'LIFESTYLE', 'BUSINESS']
+
+# The notebook's questions, as requests
+QUERIES = [
+    ('apps_per_category', {}),
+    ('average_rating', {}),
+    ('range', {'column': 'Price', 'low': 200, 'include_low': False}),
+    ('range', {'column': 'Price', 'high': 100, 'include_high': False,
+               'category': POPULAR, 'limit': 20}),
+    ('range', {'column': 'Rating', 'low': 4.5, 'limit': 20}),
+    ('range', {'column': 'Size', 'low': 2, 'high': 20, 'limit': 20}),
+    ('top', {'column': 'Installs', 'k': 10}),
+    ('top', {'column': 'Rating', 'k': 10, 'category': 'MEDICAL'}),
+    ('category_summary', {'category': 'GAME'}),
+    ('large_categories', {'min_count': 250}),
+    ('installs_by_type', {}),
+    ('polarity_by_type', {}),
+]
+
+
+def build_service(apps_path, reviews_path):
+    apps = clean_apps(deduplicate(load_apps(apps_path), normalize=False))
+    polarity, = stream_reviews(apps, [polarity_by_type()], path=reviews_path)
+    return QueryService(apps, polarity=polarity)
+
+
+def apps_reviews(apps_path, data_dir):
+    """Synthetic reviews of the apps in ``apps_path``, written once to ``data_dir``."""
+    path = os.path.join(data_dir, 'apps-csv-reviews.csv')
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        names = pd.read_csv(apps_path, usecols=['App'])['App'].unique()
+        synthetic_reviews(names, REVIEWS_PER_SCALE).to_csv(path, index=False)
+    return path
+
+
+def run(client, n_requests, threads):
+    """Replay QUERIES round-robin; return {op: array of latencies in seconds}."""
+    latencies = {}
+    lock = threading.Lock()
+
+    def one(i):
+        op, params = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        client.query(op, **params)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.setdefault(op, []).append(elapsed)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(n_requests)))
+    return {op: np.array(values) for op, values in latencies.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=float, default=None,
+                        help='use a synthetic dataset of this scale instead of apps.csv')
+    parser.add_argument('--data', default=DEFAULT_DATA)
+    parser.add_argument('--reviews', default=None, help='user_reviews.csv to score polarity on')
+    parser.add_argument('--requests', type=int, default=10_000)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--http', action='store_true')
+    parser.add_argument('--port', type=int, default=8050)
+    args = parser.parse_args(argv)
+
+    apps_path, reviews_path = DEFAULT_CSV, None
+    if args.scale is not None:
+        apps_path, reviews_path = write_dataset(os.path.join(args.data, f'{args.scale:g}x'),
+                                                args.scale)
+    if args.reviews is not None:
+        reviews_path = args.reviews
+    elif reviews_path is None:
+        reviews_path = apps_reviews(apps_path, args.data)
+    start = time.perf_counter()
+    service = build_service(apps_path, reviews_path)
+    print(f'built service over {len(service.apps)} apps in '
+          f'{time.perf_counter() - start:.2f} s')
+
+    if args.http:
+        threading.Thread(target=serve, args=(service, '127.0.0.1', args.port),
+                         daemon=True).start()
+        client = HTTPClient(f'http://127.0.0.1:{args.port}')
+        # Wait for the server to accept connections
+        for _ in range(50):
+            try:
+                client.query('average_rating')
+                break
+            except OSError:
+                time.sleep(0.1)
+    else:
+        client = LocalClient(service)
+
+    start = time.perf_counter()
+    latencies = run(client, args.requests, args.threads)
+    elapsed = time.perf_counter() - start
+    print(f'{args.requests} requests in {elapsed:.2f} s '
+          f'({args.requests / elapsed:.0f} req/s)')
+    print(f"{'op':<20} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for op, values in latencies.items():
+        p50, p99 = np.percentile(values, [50, 99]) * 1000
+        print(f'{op:<20} {p50:>9.3f} {p99:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
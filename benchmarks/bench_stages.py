@@ -0,0 +1,311 @@
+"""Time and memory-profile every stage of the analysis on synthetic data.
+
+For each scale a synthetic dataset is generated (see synthetic.py) and every
+notebook step is run twice where the package has a replacement: once as the
+notebook does it and once with playstore. Each step records wall time and
+two memory peaks from a second, untimed run in a forked child:
+
+* ``peak_bytes``, from tracemalloc, which sees Python objects and numpy's
+  buffers but not Arrow's memory pool;
+* ``arrow_peak_bytes``, from a proxy of Arrow's default memory pool, which
+  holds pandas' str columns and Arrow-backed data (None without pyarrow or
+  fork).
+
+Pages of memory-mapped files, such as the loading cache on a hit, are in
+neither: they are read from the page cache rather than allocated.
+
+Results go to a JSON report named after the current commit (in
+benchmarks/results by default), so runs on two commits can be compared:
+
+    python benchmarks/bench_stages.py --scales 10 100
+    python benchmarks/bench_stages.py --compare old.json new.json
+
+Paired steps do the same work and produce the same result. The one
+exception is ``merge+plot_prep/streamed``, which reads the reviews and builds
+the plot summaries without ever holding the merged frame; it compares with
+``merge/notebook`` and ``plot_prep/notebook`` together.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from synthetic import write_dataset  # noqa: E402
+
+from playstore.categories import CategoryStats  # noqa: E402
+from playstore.cleaning import clean_apps, clean_apps_loop  # noqa: E402
+from playstore.dedup import deduplicate  # noqa: E402
+from playstore.loading import load_apps  # noqa: E402
+from playstore.pipeline import CATEGORICAL  # noqa: E402
+from playstore.reviews import iter_merged, stream_reviews  # noqa: E402
+from playstore.sketches import installs_by_type, polarity_by_type, rating_histogram  # noqa: E402
+
+DEFAULT_SCALES = [10, 100]
+DEFAULT_DATA = os.path.join(os.path.dirname(__file__), 'data')
+DEFAULT_OUT = os.path.join(os.path.dirname(__file__), 'results')
+
+# Format of the Last Updated column
+DATE_FORMAT = '%B %d, %Y'
+
+
+def _traced_peaks(func, *args, **kwargs):
+    """Run ``func`` once; return its (tracemalloc, Arrow pool) peaks in bytes.
+
+    Arrow allocations are counted by installing a proxy of the default pool,
+    so this must only run in a process that exits right after: buffers from
+    the proxy must not outlive it. The Arrow peak is None without pyarrow.
+    """
+    proxy = None
+    if pa is not None:
+        proxy = pa.proxy_memory_pool(pa.default_memory_pool())
+        pa.set_memory_pool(proxy)
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, None if proxy is None else proxy.max_memory()
+
+
+def memory_peaks(func, *args, **kwargs):
+    """(tracemalloc, Arrow pool) peaks of one run of ``func`` in a forked child.
+
+    Without fork the step runs in this process under tracemalloc only, and
+    the Arrow peak is None.
+    """
+    if not hasattr(os, 'fork'):
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return peak, None
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.close(read)
+            os.write(write, json.dumps(_traced_peaks(func, *args, **kwargs)).encode())
+        finally:
+            os._exit(0)
+    os.close(write)
+    with os.fdopen(read) as f:
+        text = f.read()
+    _, status = os.waitpid(pid, 0)
+    if not text:
+        raise RuntimeError(f'memory run of {func!r} failed (status {status})')
+    return tuple(json.loads(text))
+
+
+def measure(func, *args, memory=True, **kwargs):
+    """Run ``func`` and return (result, seconds, peak bytes, Arrow peak bytes).
+
+    tracemalloc slows down code that allocates many Python objects, so the
+    step is timed on its own and, with ``memory``, run a second time for the
+    peaks (see memory_peaks). Both peaks are None without ``memory``.
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    if not memory:
+        return result, seconds, None, None
+    peak, arrow_peak = memory_peaks(func, *args, **kwargs)
+    return result, seconds, peak, arrow_peak
+
+
+def notebook_cast(apps):
+    """Size, Reviews, Last Updated and the categoricals, one pandas call each."""
+    apps = apps.copy()
+    apps['Size'] = pd.to_numeric(apps['Size'], errors='coerce')
+    apps['Reviews'] = pd.to_numeric(apps['Reviews'], errors='coerce')
+    apps['Last Updated'] = pd.to_datetime(apps['Last Updated'], format=DATE_FORMAT,
+                                          errors='coerce')
+    for col in CATEGORICAL:
+        apps[col] = apps[col].astype('category')
+    return apps
+
+
+def playstore_cast(apps):
+    """The pipeline's typecast stage."""
+    apps = clean_apps(apps, columns=['Size', 'Reviews', 'Last Updated'])
+    for col in CATEGORICAL:
+        apps[col] = apps[col].astype('category')
+    return apps
+
+
+def notebook_merge(apps, reviews_path):
+    """Section 10: read the reviews, merge them with apps and drop NA rows."""
+    reviews_df = pd.read_csv(reviews_path)
+    return apps.merge(reviews_df, on='App').dropna(subset=['Sentiment', 'Review'])
+
+
+def streamed_merge(apps, reviews_path):
+    """The same merged frame, built from chunks joined through an AppIndex."""
+    return pd.concat(iter_merged(apps, reviews_path), ignore_index=True)
+
+
+def notebook_plot_prep(apps, merged_df):
+    """The arrays the notebook hands to plotly/seaborn in sections 5, 9 and 10."""
+    return [apps['Rating'].to_numpy(),
+            apps[apps['Type'] == 'Paid']['Installs'].to_numpy(),
+            apps[apps['Type'] == 'Free']['Installs'].to_numpy(),
+            merged_df['Sentiment_Polarity'].to_numpy()]
+
+
+def sketch_plot_prep(apps, merged_df):
+    """The same plots' inputs as summaries, from the same frames."""
+    hist = rating_histogram().update(apps['Rating'])
+    installs = installs_by_type().update(apps)
+    polarity = polarity_by_type().update(merged_df)
+    return hist, installs, polarity
+
+
+def streamed_plot_prep(apps, reviews_path):
+    """The plot summaries with the reviews streamed, never building merged_df."""
+    hist = rating_histogram().update(apps['Rating'])
+    installs = installs_by_type().update(apps)
+    polarity, = stream_reviews(apps, [polarity_by_type()], path=reviews_path)
+    return hist, installs, polarity
+
+
+def run_scale(scale, data_dir, memory=True):
+    """Run every step on a dataset of the given scale; return the measurements."""
+    apps_path, reviews_path = write_dataset(os.path.join(data_dir, f'{scale:g}x'), scale)
+    results = {}
+
+    def step(name, func, *args, **kwargs):
+        result, seconds, peak, arrow_peak = measure(func, *args, memory=memory, **kwargs)
+        results[name] = {'seconds': round(seconds, 6), 'peak_bytes': peak,
+                         'arrow_peak_bytes': arrow_peak}
+        peak_text, arrow_text = ('-' if value is None else f'{value / 2**20:.1f}'
+                                 for value in (peak, arrow_peak))
+        print(f'  {name:<28} {seconds:>9.3f} s {peak_text:>10} MiB '
+              f'{arrow_text:>10} MiB Arrow', flush=True)
+        return result
+
+    raw = step('read/notebook', pd.read_csv, apps_path)
+    step('read/playstore', load_apps, apps_path, use_cache=False)
+    cache_dir = os.path.join(os.path.dirname(apps_path), '.cache')
+
+    def cold_load():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        return load_apps(apps_path, use_cache=True)
+
+    step('read/playstore-cache-write', cold_load)
+    step('read/playstore-cache-hit', load_apps, apps_path, use_cache=True)
+    step('read/playstore-cache-arrow', load_apps, apps_path, use_cache=True,
+         dtype_backend='pyarrow')
+
+    apps = step('dedup/notebook', raw.drop_duplicates)
+    step('dedup/playstore', deduplicate, raw, normalize=False)
+
+    step('clean/notebook', clean_apps_loop, apps)
+    apps = step('clean/playstore', clean_apps, apps, columns=['Installs', 'Price'])
+    step('cast/notebook', notebook_cast, apps)
+    step('cast/playstore', playstore_cast, apps)
+
+    step('value_counts/notebook', lambda: apps['Category'].value_counts())
+    stats = step('value_counts/playstore', CategoryStats.from_frame, apps)
+
+    present = apps.dropna(subset=['Rating', 'Size'])
+    step('groupby_filter/notebook',
+         lambda: present.groupby('Category').filter(lambda x: len(x) >= 250))
+    step('groupby_filter/playstore',
+         lambda: present[present['Category'].isin(stats.large(250))])
+
+    merged_df = step('merge/notebook', notebook_merge, apps, reviews_path)
+    step('merge/playstore', streamed_merge, apps, reviews_path)
+
+    step('plot_prep/notebook', notebook_plot_prep, apps, merged_df)
+    step('plot_prep/playstore', sketch_plot_prep, apps, merged_df)
+    del merged_df
+    step('merge+plot_prep/streamed', streamed_plot_prep, apps, reviews_path)
+    return {'scale': scale, 'rows': len(raw), 'steps': results}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(old_path, new_path):
+    """Print the change in time and peak memory of every step between two reports."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['commit']} -> {new['commit']}")
+    for scale, run in new['scales'].items():
+        if scale not in old['scales']:
+            continue
+        print(f'scale {scale}x')
+        before = old['scales'][scale]['steps']
+        for name, after in run['steps'].items():
+            if name not in before:
+                continue
+            time_ratio = after['seconds'] / max(before[name]['seconds'], 1e-9)
+            line = f'  {name:<28} time x{time_ratio:>6.2f}'
+            for key, label in [('peak_bytes', 'memory'), ('arrow_peak_bytes', 'Arrow')]:
+                # Reports from before arrow_peak_bytes was recorded lack the key
+                old_peak, new_peak = before[name].get(key), after.get(key)
+                if old_peak is not None and new_peak is not None:
+                    line += f'   {label} x{new_peak / max(old_peak, 1):>6.2f}'
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=float, nargs='+', default=DEFAULT_SCALES)
+    parser.add_argument('--data', default=DEFAULT_DATA,
+                        help='directory for the generated datasets')
+    parser.add_argument('--out', default=DEFAULT_OUT, help='directory for the JSON report')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='skip the memory runs of every step')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'))
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'scales': {},
+    }
+    for scale in args.scales:
+        label = f'{scale:g}'
+        print(f'scale {label}x')
+        report['scales'][label] = run_scale(scale, args.data,
+                                              memory=not args.no_memory)
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"bench-{report['commit']}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(path)
+
+
+if __name__ == '__main__':
+    main()
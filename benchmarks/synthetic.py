@@ -0,0 +1,130 @@
+"""Synthetic apps.csv / user_reviews.csv at a multiple of the original size.
+
+Rows are drawn from the distributions in the shipped apps.csv so the raw
+strings look like the real ones: Installs like '10,000+', prices like '$4.99',
+';'-separated Genres and 'Month D, YYYY' dates. Category, Genres, Type, Price,
+Content Rating and Android Ver are drawn together from one template row, so
+that paid apps have prices and genres match their category; the other columns
+are drawn independently. A share of rows is repeated to give drop_duplicates
+something to do.
+
+Reviews follow the shape of the original user_reviews.csv: about 64k rows per
+unit of scale spread over roughly one app in nine, with a sizeable share of
+rows missing Review and Sentiment, and a Sentiment that agrees with the sign
+of Sentiment_Polarity.
+
+    python benchmarks/synthetic.py --scale 10 --out datasets-10x
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+TEMPLATE_CSV = os.path.join(os.path.dirname(__file__), '..', 'apps.csv')
+
+# Size of the original user_reviews.csv and the share of apps it covers
+REVIEWS_PER_SCALE = 64_295
+REVIEWED_APPS = 0.11
+
+# Share of review rows with no Review / Sentiment, and of apps rows repeated
+MISSING_REVIEWS = 0.4
+DUPLICATE_APPS = 0.01
+
+# Columns drawn together from one template row
+JOINT = ['Category', 'Genres', 'Type', 'Price', 'Content Rating', 'Android Ver']
+
+# Columns drawn independently from their own distribution
+INDEPENDENT = ['Rating', 'Reviews', 'Size', 'Installs', 'Last Updated', 'Current Ver']
+
+# Words used to build review text
+POSITIVE_WORDS = ['great', 'love', 'good', 'amazing', 'easy', 'best', 'nice', 'helpful']
+NEGATIVE_WORDS = ['bad', 'hate', 'crash', 'problem', 'refund', 'slow', 'ads', 'worst']
+NEUTRAL_WORDS = ['app', 'use', 'time', 'update', 'phone', 'work', 'game', 'version']
+
+
+def synthetic_apps(n_rows, template=None, seed=0):
+    """Return a raw apps frame with ``n_rows`` rows (duplicates included)."""
+    if template is None:
+        template = pd.read_csv(TEMPLATE_CSV, dtype=str, keep_default_na=False)
+    rng = np.random.default_rng(seed)
+    n_unique = n_rows - int(n_rows * DUPLICATE_APPS)
+    columns = {'App': np.char.add('App ', np.arange(n_unique).astype(str))}
+    picked = rng.integers(0, len(template), n_unique)
+    for col in JOINT:
+        columns[col] = template[col].to_numpy()[picked]
+    for col in INDEPENDENT:
+        columns[col] = template[col].to_numpy()[rng.integers(0, len(template), n_unique)]
+    apps = pd.DataFrame(columns)[['App', 'Category', 'Rating', 'Reviews', 'Size',
+                                  'Installs', 'Type', 'Price', 'Content Rating',
+                                  'Genres', 'Last Updated', 'Current Ver',
+                                  'Android Ver']]
+    repeats = apps.iloc[rng.integers(0, n_unique, n_rows - n_unique)]
+    return pd.concat([apps, repeats], ignore_index=True)
+
+
+def synthetic_reviews(app_names, n_rows, seed=0):
+    """Return a reviews frame with ``n_rows`` rows about a subset of ``app_names``."""
+    rng = np.random.default_rng(seed + 1)
+    reviewed = rng.choice(app_names, max(1, int(len(app_names) * REVIEWED_APPS)),
+                          replace=False)
+    polarity = np.clip(rng.normal(0.18, 0.35, n_rows), -1, 1).round(3)
+    polarity[rng.random(n_rows) < 0.1] = 0.0
+    sentiment = np.where(polarity > 0, 'Positive',
+                         np.where(polarity < 0, 'Negative', 'Neutral')).astype(object)
+    # One word matching the sign of the polarity, then a neutral one
+    positive = np.array(POSITIVE_WORDS, dtype=object)
+    negative = np.array(NEGATIVE_WORDS, dtype=object)
+    neutral = np.array(NEUTRAL_WORDS, dtype=object)
+    review = np.where(polarity >= 0,
+                      positive[rng.integers(0, len(positive), n_rows)],
+                      negative[rng.integers(0, len(negative), n_rows)])
+    review = review + ' ' + neutral[rng.integers(0, len(neutral), n_rows)]
+    subjectivity = rng.beta(2, 2, n_rows).round(3)
+    missing = rng.random(n_rows) < MISSING_REVIEWS
+    review[missing] = None
+    sentiment[missing] = None
+    polarity = np.where(missing, np.nan, polarity)
+    subjectivity = np.where(missing, np.nan, subjectivity)
+    return pd.DataFrame({
+        'App': reviewed[rng.integers(0, len(reviewed), n_rows)],
+        'Review': review,
+        'Sentiment': sentiment,
+        'Sentiment_Polarity': polarity,
+        'Sentiment_Subjectivity': subjectivity,
+    })
+
+
+def write_dataset(directory, scale, seed=0):
+    """Write apps.csv and user_reviews.csv at ``scale`` times the original size.
+
+    Existing files are reused. Returns the two paths.
+    """
+    apps_path = os.path.join(directory, 'apps.csv')
+    reviews_path = os.path.join(directory, 'user_reviews.csv')
+    if os.path.exists(apps_path) and os.path.exists(reviews_path):
+        return apps_path, reviews_path
+    os.makedirs(directory, exist_ok=True)
+    template = pd.read_csv(TEMPLATE_CSV, dtype=str, keep_default_na=False)
+    apps = synthetic_apps(int(len(template) * scale), template, seed=seed)
+    # Written like the original, with a leading unnamed index column
+    apps.to_csv(apps_path)
+    reviews = synthetic_reviews(apps['App'].unique(), int(REVIEWS_PER_SCALE * scale),
+                                seed=seed)
+    reviews.to_csv(reviews_path, index=False)
+    return apps_path, reviews_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=float, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', required=True)
+    args = parser.parse_args(argv)
+    for path in write_dataset(args.out, args.scale, seed=args.seed):
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Reusable building blocks for the Google Play Store apps and reviews analysis."""
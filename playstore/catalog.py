@@ -0,0 +1,195 @@
+"""Compact, indexed in-memory form of the apps table.
+
+The notebook's ``apps`` frame keeps App, Category, Genres, Content Rating,
+Current Ver and Android Ver as Python strings, and Genres packs several
+values into one string ('Art & Design;Pretend Play') that can only be
+searched with string matching. ``AppCatalog`` stores the same table as:
+
+* dictionary-encoded categoricals for the low-cardinality text columns,
+* narrow numeric types (float32 Rating and Size, uint32 Reviews and, where
+  the counts fit, uint32 Installs),
+* Android Ver parsed into the minimum and maximum API levels it covers,
+* Last Updated as datetime64,
+
+plus inverted indexes from each category and each individual genre to the
+sorted row positions that carry it, so slicing by genre or category is a
+lookup rather than a scan.
+"""
+
+import numpy as np
+import pandas as pd
+
+from playstore.cleaning import clean_apps
+
+# Text columns stored as categoricals
+DICTIONARY_COLUMNS = ['Category', 'Type', 'Content Rating', 'Genres', 'Current Ver']
+
+# Narrow dtypes of the numeric columns. Integer columns whose values do not
+# fit are widened to uint64 (Installs has 5,000,000,000+ tiers in full dumps).
+NUMERIC_DTYPES = {
+    'Rating': np.float32,
+    'Size': np.float32,
+    'Reviews': np.uint32,
+    'Installs': np.uint32,
+    # Prices stay float64 so that thresholds like Price > 200 compare exactly
+    'Price': np.float64,
+}
+
+# API level of each Android version named in the Android Ver column
+API_LEVELS = {
+    '1.0': 1, '1.1': 2, '1.5': 3, '1.6': 4, '2.0': 5, '2.0.1': 6, '2.1': 7,
+    '2.2': 8, '2.3': 9, '2.3.3': 10, '3.0': 11, '3.1': 12, '3.2': 13,
+    '4.0': 14, '4.0.3': 15, '4.1': 16, '4.2': 17, '4.3': 18, '4.4': 19,
+    '4.4W': 20, '5.0': 21, '5.1': 22, '6.0': 23, '7.0': 24, '7.1': 25,
+    '7.1.1': 25, '8.0': 26, '8.1': 27,
+}
+
+# Separator of the values packed into Genres
+GENRE_SEP = ';'
+
+
+def parse_api_range(android_ver):
+    """Return (min_api, max_api) uint8 arrays for an Android Ver column.
+
+    '4.0.3 and up' gives (15, 0) and '4.1 - 7.1.1' gives (16, 25); 0 means
+    no bound or unknown, e.g. for 'Varies with device'. Each distinct string
+    is parsed once.
+    """
+    codes, uniques = pd.factorize(android_ver)
+    low = np.zeros(len(uniques) + 1, dtype=np.uint8)
+    high = np.zeros(len(uniques) + 1, dtype=np.uint8)
+    for i, text in enumerate(uniques):
+        text = str(text)
+        if ' - ' in text:
+            first, last = text.split(' - ', 1)
+            high[i] = API_LEVELS.get(last.strip(), 0)
+        else:
+            first = text.replace(' and up', '')
+        low[i] = API_LEVELS.get(first.strip(), 0)
+    # Missing values have code -1, which picks the trailing zero
+    return low[codes], high[codes]
+
+
+class InvertedIndex:
+    """Sorted row positions for each label, stored as one CSR-style array.
+
+    ``rows[offsets[i]:offsets[i + 1]]`` are the rows carrying ``labels[i]``.
+    """
+
+    def __init__(self, labels, offsets, rows):
+        self.labels = pd.Index(labels)
+        self.offsets = offsets
+        self.rows = rows
+
+    @classmethod
+    def from_values(cls, values, sep=None):
+        """Build the index of a column; with ``sep``, one row can carry several labels."""
+        codes, uniques = pd.factorize(values)
+        order = np.argsort(codes, kind='stable').astype(np.int32)
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        members = {}
+        for code, value in enumerate(uniques):
+            # A label repeated within one value ('Education;Education')
+            # must not list the same rows twice
+            for label in (dict.fromkeys(str(value).split(sep)) if sep else [value]):
+                members.setdefault(label, []).append(code)
+        labels, offsets, rows = [], [0], []
+        for label, label_codes in members.items():
+            parts = [order[bounds[code]:bounds[code + 1]] for code in label_codes]
+            label_rows = np.sort(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+            labels.append(label)
+            rows.append(label_rows)
+            offsets.append(offsets[-1] + len(label_rows))
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int32)
+        return cls(labels, np.asarray(offsets, dtype=np.int64), rows)
+
+    def __contains__(self, label):
+        return label in self.labels
+
+    def get(self, label):
+        """Sorted row positions of ``label`` (empty if unknown)."""
+        pos = self.labels.get_indexer([label])[0]
+        if pos < 0:
+            return self.rows[:0]
+        return self.rows[self.offsets[pos]:self.offsets[pos + 1]]
+
+    def counts(self):
+        """Number of rows per label, largest first."""
+        return pd.Series(np.diff(self.offsets), index=self.labels).sort_values(
+            ascending=False)
+
+    @property
+    def nbytes(self):
+        return self.offsets.nbytes + self.rows.nbytes
+
+
+class AppCatalog:
+    """The apps table in compact form, with category and genre indexes."""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.categories = InvertedIndex.from_values(frame['Category'])
+        self.genres = InvertedIndex.from_values(frame['Genres'], sep=GENRE_SEP)
+
+    @classmethod
+    def from_frame(cls, apps):
+        """Build a catalog from the raw or cleaned apps frame."""
+        apps = clean_apps(apps)
+        columns = {'App': apps['App'].astype('string[pyarrow]')
+                   if _has_pyarrow() else apps['App']}
+        for col in DICTIONARY_COLUMNS:
+            columns[col] = apps[col].astype('category')
+        for col, dtype in NUMERIC_DTYPES.items():
+            values = apps[col]
+            if np.issubdtype(dtype, np.integer):
+                # Integer columns cannot hold NaN; missing counts become 0
+                values = values.fillna(0)
+                dtype = _fitting_dtype(values, dtype)
+            columns[col] = values.astype(dtype)
+        columns['Last Updated'] = apps['Last Updated'].astype('datetime64[s]')
+        columns['Min API'], columns['Max API'] = parse_api_range(apps['Android Ver'])
+        frame = pd.DataFrame(columns)
+        frame.index = pd.RangeIndex(len(frame))
+        return cls(frame)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def genre_rows(self, genre):
+        return self.genres.get(genre)
+
+    def category_rows(self, category):
+        return self.categories.get(category)
+
+    def select(self, category=None, genre=None):
+        """Rows in ``category`` and/or carrying ``genre``."""
+        rows = None
+        if category is not None:
+            rows = self.category_rows(category)
+        if genre is not None:
+            genre_rows = self.genre_rows(genre)
+            rows = genre_rows if rows is None else np.intersect1d(
+                rows, genre_rows, assume_unique=True)
+        if rows is None:
+            return self.frame
+        return self.frame.iloc[rows]
+
+    def memory_usage(self):
+        """Bytes used by the table and its indexes."""
+        return (int(self.frame.memory_usage(deep=True).sum())
+                + self.categories.nbytes + self.genres.nbytes)
+
+
+def _fitting_dtype(values, dtype):
+    """``dtype`` if it holds every value, else uint64; astype would wrap around."""
+    if len(values) and values.max() > np.iinfo(dtype).max:
+        return np.uint64
+    return dtype
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
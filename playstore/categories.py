@@ -0,0 +1,204 @@
+"""Per-category and per-genre statistics built in one vectorized pass.
+
+Section 4 counts apps with ``value_counts``, section 6 keeps categories with at
+least 250 apps through ``groupby('Category').filter(lambda x: len(x) >= 250)``,
+which calls back into Python once per group and copies every sub-frame, and
+section 7 rescans the frame with ``isin``. ``CategoryStats`` computes counts
+and Rating/Size/Price moments for every value of a key column at once and
+keeps the row codes, so those questions become lookups in a small table:
+
+    stats = CategoryStats.from_frame(apps)
+    stats.counts()                      # section 4
+    stats.large(250)                    # categories kept in section 6
+    apps[stats.mask(['GAME', 'FAMILY'])]  # section 7
+
+``Genres`` holds ``;``-joined values; with ``sep=';'`` each app counts towards
+every genre it lists. Frames split into partitions can be processed in a
+process pool with ``from_partitions`` and the partial results are merged.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+# Value columns summarized for each category
+VALUES = ('Rating', 'Size', 'Price')
+
+# Columns that must all be present for a row to count in ``present``;
+# section 6 only looks at apps with both a Rating and a Size
+PRESENT = ('Rating', 'Size')
+
+# How each column of the statistics table is combined across partitions
+_SUM = 'sum'
+_MIN = 'min'
+_MAX = 'max'
+
+
+def _table_columns(values):
+    columns = {'count': _SUM, 'present': _SUM}
+    for col in values:
+        columns.update({f'{col}_count': _SUM, f'{col}_sum': _SUM,
+                        f'{col}_sum_sq': _SUM, f'{col}_min': _MIN,
+                        f'{col}_max': _MAX})
+    return columns
+
+
+def _partial_table(frame, codes, n_labels, values, present):
+    """Sums, minima and maxima of ``values`` for every code in one pass each."""
+    valid = codes >= 0
+    codes = codes[valid]
+    table = {'count': np.bincount(codes, minlength=n_labels)}
+    mask = np.ones(len(frame), dtype=bool)
+    for col in present:
+        mask &= frame[col].notna().to_numpy()
+    table['present'] = np.bincount(codes, weights=mask[valid], minlength=n_labels)
+    for col in values:
+        data = frame[col].to_numpy(dtype=np.float64, na_value=np.nan)[valid]
+        notna = ~np.isnan(data)
+        filled = np.where(notna, data, 0.0)
+        table[f'{col}_count'] = np.bincount(codes, weights=notna, minlength=n_labels)
+        table[f'{col}_sum'] = np.bincount(codes, weights=filled, minlength=n_labels)
+        table[f'{col}_sum_sq'] = np.bincount(codes, weights=filled ** 2,
+                                             minlength=n_labels)
+        grouped = pd.Series(data).groupby(codes)
+        table[f'{col}_min'] = grouped.min().reindex(range(n_labels)).to_numpy()
+        table[f'{col}_max'] = grouped.max().reindex(range(n_labels)).to_numpy()
+    return pd.DataFrame(table)
+
+
+def _combine(table, by):
+    """Combine rows of a statistics table that share a value of ``by``."""
+    how = {col: agg for col, agg in _table_columns(_values_of(table)).items()
+           if col in table.columns}
+    return table.groupby(by, sort=False, observed=True).agg(how)
+
+
+def _values_of(table):
+    return [col[:-len('_sum_sq')] for col in table.columns if col.endswith('_sum_sq')]
+
+
+class CategoryStats:
+    """Statistics of ``values`` for every distinct value of ``key``.
+
+    ``labels`` are the distinct raw values of the key column and ``codes``
+    gives the label of each row (-1 for missing). With ``sep`` set, a raw
+    value such as 'Art & Design;Pretend Play' is split and the statistics in
+    ``table`` are kept per member ('Art & Design', 'Pretend Play').
+    """
+
+    def __init__(self, key, labels, codes, label_table, sep=None):
+        self.key = key
+        self.sep = sep
+        self.labels = labels
+        self.codes = codes
+        self.label_table = label_table
+        self.table = self._member_table()
+
+    @classmethod
+    def from_frame(cls, frame, key='Category', values=VALUES, present=PRESENT,
+                   sep=None):
+        codes, labels = pd.factorize(frame[key])
+        codes = codes.astype(np.int32)
+        values = [col for col in values if col in frame.columns]
+        table = _partial_table(frame, codes, len(labels), values, present)
+        table.index = pd.Index(labels, name=key)
+        return cls(key, pd.Index(labels), codes, table, sep=sep)
+
+    @classmethod
+    def from_partitions(cls, partitions, key='Category', values=VALUES,
+                        present=PRESENT, sep=None, processes=None):
+        """Compute statistics for each partition in a process pool and merge them.
+
+        Row codes of the result follow the order of ``partitions``.
+        """
+        compute = partial(_from_frame, key=key, values=tuple(values),
+                          present=tuple(present), sep=sep)
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = list(pool.map(compute, partitions))
+        return cls.merge_all(parts)
+
+    @classmethod
+    def merge_all(cls, parts):
+        """Merge statistics computed on consecutive partitions of a frame."""
+        first = parts[0]
+        labels = pd.Index(pd.unique(np.concatenate([part.labels.to_numpy()
+                                                    for part in parts])))
+        codes = []
+        for part in parts:
+            remap = labels.get_indexer(part.labels).astype(np.int32)
+            codes.append(np.where(part.codes >= 0, remap[part.codes], -1))
+        table = pd.concat([part.label_table for part in parts])
+        table = _combine(table, table.index).reindex(labels)
+        table.index.name = first.key
+        return cls(first.key, labels, np.concatenate(codes).astype(np.int32),
+                   table, sep=first.sep)
+
+    def _members(self):
+        """Map each label to the list of distinct members it stands for.
+
+        A member repeated within a label ('Education;Education') counts once.
+        """
+        if self.sep is None:
+            return pd.Series([[label] for label in self.labels], index=self.labels)
+        return pd.Series([list(dict.fromkeys(str(label).split(self.sep)))
+                          for label in self.labels], index=self.labels)
+
+    def _member_table(self):
+        if self.sep is None:
+            return self.label_table
+        table = self.label_table.copy()
+        table['_member'] = self._members().to_numpy()
+        table = table.explode('_member')
+        result = _combine(table.drop(columns='_member'), table['_member'].to_numpy())
+        result.index.name = self.key
+        return result
+
+    def counts(self, column='count'):
+        """Number of apps per category, largest first (``value_counts``)."""
+        return self.table[column].astype(np.int64).sort_values(ascending=False)
+
+    def large(self, min_count=250, column='present'):
+        """Categories with at least ``min_count`` rows counted in ``column``."""
+        table = self.table
+        return table.index[table[column] >= min_count]
+
+    def summary(self):
+        """Count, mean, population standard deviation, min and max per value column."""
+        table = self.table
+        result = {'count': table['count'].astype(np.int64)}
+        for col in _values_of(table):
+            n = table[f'{col}_count']
+            mean = table[f'{col}_sum'] / n
+            var = table[f'{col}_sum_sq'] / n - mean ** 2
+            result[f'{col}_mean'] = mean
+            result[f'{col}_std'] = np.sqrt(var.clip(lower=0))
+            result[f'{col}_min'] = table[f'{col}_min']
+            result[f'{col}_max'] = table[f'{col}_max']
+        return pd.DataFrame(result)
+
+    def label_codes(self, members):
+        """Codes of the labels that contain any of ``members``."""
+        members = set(np.atleast_1d(members))
+        hits = self._members().map(lambda parts: not members.isdisjoint(parts))
+        return np.flatnonzero(hits.to_numpy())
+
+    def mask(self, members):
+        """Boolean row mask for ``members``, like ``frame[key].isin(members)``."""
+        return np.isin(self.codes, self.label_codes(members))
+
+    def rows(self, members):
+        """Row positions whose key contains any of ``members``."""
+        return np.flatnonzero(self.mask(members))
+
+
+def _from_frame(frame, key, values, present, sep):
+    return CategoryStats.from_frame(frame, key=key, values=values,
+                                    present=present, sep=sep)
+
+
+def genre_stats(frame, values=VALUES, present=PRESENT):
+    """CategoryStats over the individual genres of the ``;``-joined Genres column."""
+    return CategoryStats.from_frame(frame, key='Genres', values=values,
+                                    present=present, sep=';')
@@ -0,0 +1,229 @@
+"""Vectorized cleaning of the raw Play Store columns.
+
+The notebook strips ``+``, ``,`` and ``$`` from ``Installs`` and ``Price`` with
+one ``apply`` per (column, character) pair and then calls ``astype(float)``.
+The parsers below do the same job in a single pass per column: the strings are
+packed into a fixed-width byte matrix and the digits are accumulated straight
+into a float64 array, so no intermediate string copies are built. Columns are
+factorized first, so each distinct string is parsed only once; a store dump has
+a few dozen distinct Installs and Price values however many rows it holds.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Byte values used by the parsers
+_ZERO = ord('0')
+_NINE = ord('9')
+_DOT = ord('.')
+
+# Bytes skipped inside a number: thousands separators, '+', currency and spaces
+_SKIPPED = np.frombuffer(b'+,$ ', dtype=np.uint8)
+
+# Characters removed before pd.to_numeric on the fallback path
+_STRIP_PATTERN = r'[+,$\s]'
+
+# Multipliers for the Size suffixes found in the raw store dump (result in MB)
+SIZE_UNITS = {ord('M'): 1.0, ord('k'): 1.0 / 1024, ord('G'): 1024.0}
+
+# Format of the Last Updated column, e.g. 'January 7, 2018'
+DATE_FORMAT = '%B %d, %Y'
+
+
+def _byte_matrix(values):
+    """Pack an array of strings into an (n, width) uint8 matrix.
+
+    Missing values become empty rows. Returns None if the strings are not
+    plain ASCII, in which case the caller falls back to the pandas string path.
+    """
+    values = pd.Series(values, copy=False).fillna('').to_numpy(dtype=object)
+    try:
+        packed = values.astype('S')
+    except UnicodeEncodeError:
+        return None
+    width = packed.dtype.itemsize
+    if len(packed) == 0 or width == 0:
+        return np.zeros((len(packed), 1), dtype=np.uint8)
+    return packed.view(np.uint8).reshape(len(packed), width)
+
+
+def _parse_decimal(matrix):
+    """Parse each row of a byte matrix as a decimal number.
+
+    Thousands separators, ``+``, ``$`` and spaces are skipped, which covers
+    the Installs and Price formats in one pass. Rows without any digit, with a
+    second ``.`` or with any other byte (a sign, an exponent, a letter) are
+    returned as NaN rather than parsed from their digits alone.
+    """
+    n = matrix.shape[0]
+    value = np.zeros(n, dtype=np.float64)
+    scale = np.ones(n, dtype=np.float64)
+    seen_dot = np.zeros(n, dtype=bool)
+    seen_digit = np.zeros(n, dtype=bool)
+    invalid = np.zeros(n, dtype=bool)
+    for j in range(matrix.shape[1]):
+        byte = matrix[:, j]
+        is_digit = (byte >= _ZERO) & (byte <= _NINE)
+        is_dot = byte == _DOT
+        digit = byte.astype(np.float64) - _ZERO
+        value = np.where(is_digit, value * 10 + digit, value)
+        scale = np.where(is_digit & seen_dot, scale * 10, scale)
+        invalid |= is_dot & seen_dot
+        invalid |= ~(is_digit | is_dot | (byte == 0) | np.isin(byte, _SKIPPED))
+        seen_dot |= is_dot
+        seen_digit |= is_digit
+    result = value / scale
+    result[~seen_digit | invalid] = np.nan
+    return result
+
+
+def _last_index(matrix):
+    """Return the position of the last non-padding byte of every row.
+
+    Empty rows get the last position, which holds a padding zero.
+    """
+    filled = matrix != 0
+    return matrix.shape[1] - 1 - np.argmax(filled[:, ::-1], axis=1)
+
+
+def _parse_distinct(series, parse, fallback):
+    """Apply a byte-matrix parser to the distinct values of a string Series.
+
+    ``parse`` maps an (n, width) byte matrix to a float64 array. Distinct
+    values it leaves as NaN, and every value of a non-ASCII column, are passed
+    to ``fallback``, which maps a Series of strings to float64.
+    """
+    codes, uniques = pd.factorize(series)
+    uniques = pd.Series(uniques)
+    matrix = _byte_matrix(uniques)
+    if matrix is None:
+        parsed = fallback(uniques).to_numpy(dtype=np.float64)
+    else:
+        parsed = parse(matrix)
+        retry = np.isnan(parsed)
+        if retry.any():
+            parsed[retry] = fallback(uniques[retry]).to_numpy(dtype=np.float64)
+    # Missing values get code -1, which picks the trailing NaN
+    parsed = np.append(parsed, np.nan)
+    return pd.Series(parsed[codes], index=series.index, name=series.name)
+
+
+def _to_numeric(series):
+    """Slow path: strip the skipped characters, then pd.to_numeric.
+
+    This is what the notebook's replace-then-astype(float) loop computes, so
+    '-1' and '1e3' keep their values; anything else becomes NaN.
+    """
+    stripped = series.astype('string').str.replace(_STRIP_PATTERN, '', regex=True)
+    return pd.to_numeric(stripped, errors='coerce').astype(np.float64)
+
+
+def _size_to_numeric(series):
+    """Slow path for Size strings: a number with an optional unit suffix."""
+    units = {chr(unit): multiplier for unit, multiplier in SIZE_UNITS.items()}
+    parts = series.astype('string').str.extract(
+        r'^\s*([0-9.,]+)\s*([%s]?)\s*$' % ''.join(units))
+    value = _to_numeric(parts[0])
+    return value * parts[1].map(units).fillna(1.0).astype(np.float64)
+
+
+def _parse_size_matrix(matrix):
+    """Parse a byte matrix of Size strings, applying the unit suffix."""
+    rows = np.arange(len(matrix))
+    last = _last_index(matrix)
+    suffix = matrix[rows, last]
+    has_unit = np.isin(suffix, list(SIZE_UNITS))
+    # The suffix is dropped before parsing so that it is not an invalid byte
+    number = matrix.copy()
+    number[rows[has_unit], last[has_unit]] = 0
+    value = _parse_decimal(number)
+    for unit, multiplier in SIZE_UNITS.items():
+        value[suffix == unit] *= multiplier
+    return value
+
+
+def parse_number(series):
+    """Parse strings like '10,000+' or '$4.99' into a float64 Series.
+
+    Numeric input is returned as float64 without being re-parsed. Strings that
+    are not numbers once ``+``, ``,``, ``$`` and spaces are removed become NaN.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(np.float64)
+    return _parse_distinct(series, _parse_decimal, _to_numeric)
+
+
+def parse_installs(series):
+    """Parse the Installs column ('10,000+') into float64."""
+    return parse_number(series)
+
+
+def parse_price(series):
+    """Parse the Price column ('$4.99', '0') into float64."""
+    return parse_number(series)
+
+
+def parse_reviews(series):
+    """Parse the Reviews column into review counts.
+
+    Reviews is already read as int64 from the cleaned ``apps.csv`` and is
+    returned unchanged in that case; raw dumps with string counts are parsed
+    into float64, with NaN for entries that are not numbers.
+    """
+    if pd.api.types.is_integer_dtype(series):
+        return series
+    return parse_number(series)
+
+
+def parse_size(series):
+    """Parse the Size column into megabytes.
+
+    The cleaned ``apps.csv`` already stores Size as MB floats, which are passed
+    through. Raw store dumps use '19M' / '8.7k' and 'Varies with device'; the
+    suffix is applied as a multiplier and unparseable entries become NaN.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(np.float64)
+    return _parse_distinct(series, _parse_size_matrix, _size_to_numeric)
+
+
+def parse_last_updated(series):
+    """Parse the Last Updated column ('January 7, 2018') into datetime64."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    # to_datetime caches repeated strings, and a store dump has few distinct dates
+    return pd.to_datetime(series, format=DATE_FORMAT, errors='coerce', cache=True)
+
+
+# Parser used for each column by clean_apps
+PARSERS = {
+    'Installs': parse_installs,
+    'Price': parse_price,
+    'Size': parse_size,
+    'Reviews': parse_reviews,
+    'Last Updated': parse_last_updated,
+}
+
+
+def clean_apps(apps, columns=None):
+    """Return a copy of ``apps`` with the given columns parsed to typed arrays.
+
+    ``columns`` defaults to every column in PARSERS that is present in the frame.
+    """
+    if columns is None:
+        columns = [col for col in PARSERS if col in apps.columns]
+    cleaned = apps.copy()
+    for col in columns:
+        cleaned[col] = PARSERS[col](apps[col])
+    return cleaned
+
+
+def clean_apps_loop(apps, cols_to_clean=('Installs', 'Price'),
+                    chars_to_remove=('+', ',', '$')):
+    """The notebook's original cleaning loop, kept as a benchmark baseline."""
+    apps = apps.copy()
+    for col in cols_to_clean:
+        for char in chars_to_remove:
+            apps[col] = apps[col].apply(lambda x: x.replace(char, ''))
+        apps[col] = apps[col].astype(float)
+    return apps
@@ -0,0 +1,159 @@
+"""Fingerprint-based deduplication of app rows.
+
+``apps_with_duplicates.drop_duplicates()`` compares every column of every row
+as Python objects. Here each row is reduced to a 64-bit fingerprint of its
+normalized fields (see playstore.hashing) and duplicates are found on that
+array alone.
+
+``FingerprintIndex`` keeps the fingerprints of every row accepted so far in
+sorted ``.npy`` runs on disk, so a later batch, e.g. another region's dump,
+can be deduplicated against earlier ones without reloading them. The key can be
+narrowed to collapse near-duplicates, e.g. ``key=NEAR_DUPLICATE_KEY`` keeps
+one row per app name and version.
+
+Values are hashed with SipHash, so fingerprints behave like random 64-bit
+numbers: the chance of any collision among a billion distinct rows is about
+3%, and a collision drops a row that is not a real duplicate.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from playstore.hashing import FINGERPRINT_VERSION, normalized_fingerprints
+
+# Key that treats rows of the same app and version as duplicates
+NEAR_DUPLICATE_KEY = ('App', 'Current Ver')
+
+
+def duplicated(frame, key=None, normalize=True, casefold=False):
+    """Boolean mask of rows whose key repeats an earlier row's key."""
+    fingerprints = normalized_fingerprints(frame, key, normalize=normalize,
+                                           casefold=casefold)
+    return pd.Index(fingerprints).duplicated(keep='first')
+
+
+def deduplicate(frame, key=None, normalize=True, casefold=False):
+    """Drop duplicate rows, keeping the first (``drop_duplicates`` on fingerprints).
+
+    ``key`` restricts the columns compared; by default every column is.
+    """
+    return frame[~duplicated(frame, key, normalize=normalize, casefold=casefold)]
+
+
+def _sorted_unique(values):
+    """Sorted distinct values (np.unique without its hash table)."""
+    values = np.sort(values)
+    if len(values) == 0:
+        return values
+    return values[np.concatenate([[True], values[1:] != values[:-1]])]
+
+
+class FingerprintIndex:
+    """Persisted set of row fingerprints, kept as sorted runs in a directory.
+
+    Each ``save`` writes the fingerprints added since the last one as a new
+    sorted ``.npy`` run. Earlier runs are memory-mapped and never rewritten,
+    so membership checks only touch the pages binary search visits and adding
+    a batch costs in proportion to the batch. Once there are more than
+    ``max_runs`` runs, ``save`` merges them into one.
+
+    ``index.json`` lists the runs along with the key, normalization and hash
+    version the fingerprints were made with; opening the directory with
+    other settings raises ValueError instead of mixing fingerprint kinds.
+    """
+
+    META = 'index.json'
+
+    def __init__(self, directory, key=None, normalize=True, casefold=False, max_runs=8):
+        self.directory = directory
+        self.key = None if key is None else list(key)
+        self.normalize = normalize
+        self.casefold = casefold
+        self.max_runs = max_runs
+        self.settings = {'key': self.key, 'normalize': normalize, 'casefold': casefold,
+                         'version': FINGERPRINT_VERSION}
+        self.run_names = []
+        self.runs = []
+        meta_path = os.path.join(directory, self.META)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta['settings'] != self.settings:
+                raise ValueError(f"{directory} holds fingerprints made with "
+                                 f"{meta['settings']}, not {self.settings}")
+            self.run_names = meta['runs']
+            self.runs = [np.load(os.path.join(directory, name), mmap_mode='r')
+                         for name in self.run_names]
+        # Fingerprints added since the last save, sorted
+        self.pending = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs) + len(self.pending)
+
+    def contains(self, fingerprints):
+        """Boolean mask of ``fingerprints`` already in the index."""
+        fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        # Searching in sorted order walks each run front to back
+        order = np.argsort(fingerprints)
+        needles = fingerprints[order]
+        found = np.zeros(len(fingerprints), dtype=bool)
+        for run in self.runs + [self.pending]:
+            if len(run) == 0:
+                continue
+            pos = np.minimum(np.searchsorted(run, needles), len(run) - 1)
+            found |= run[pos] == needles
+        result = np.empty_like(found)
+        result[order] = found
+        return result
+
+    def add(self, fingerprints):
+        """Add ``fingerprints`` to the index (in memory until ``save``)."""
+        fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        self.pending = _sorted_unique(np.concatenate([self.pending, fingerprints]))
+        return self
+
+    def _write_run(self, fingerprints):
+        number = 1 + max((int(name[4:-4]) for name in self.run_names), default=0)
+        name = f'run-{number:06d}.npy'
+        # np.save appends .npy to names without it, so write to such a name
+        tmp = os.path.join(self.directory, name + '.tmp.npy')
+        np.save(tmp, np.ascontiguousarray(fingerprints))
+        os.replace(tmp, os.path.join(self.directory, name))
+        return name
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        old_names = []
+        if len(self.pending):
+            self.run_names.append(self._write_run(self.pending))
+            self.runs.append(self.pending)
+            self.pending = np.empty(0, dtype=np.uint64)
+        if len(self.runs) > self.max_runs:
+            merged = _sorted_unique(np.concatenate(self.runs))
+            old_names = self.run_names
+            self.run_names = [self._write_run(merged)]
+            self.runs = [merged]
+        tmp = os.path.join(self.directory, self.META + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'settings': self.settings, 'runs': self.run_names}, f, indent=2)
+        # The run list is replaced before merged runs are removed, so an
+        # interrupted save leaves stray files but never a broken index
+        os.replace(tmp, os.path.join(self.directory, self.META))
+        for name in old_names:
+            os.remove(os.path.join(self.directory, name))
+
+    def deduplicate(self, batch):
+        """Rows of ``batch`` seen neither earlier in the batch nor in the index.
+
+        Their fingerprints are added to the index; call ``save`` to persist.
+        """
+        fingerprints = normalized_fingerprints(batch, self.key,
+                                               normalize=self.normalize,
+                                               casefold=self.casefold)
+        keep = ~pd.Index(fingerprints).duplicated(keep='first')
+        keep &= ~self.contains(fingerprints)
+        self.add(fingerprints[keep])
+        return batch[keep]
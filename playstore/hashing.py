@@ -0,0 +1,152 @@
+"""64-bit row fingerprints.
+
+A fingerprint stands in for a whole row when rows are compared between
+snapshots or checked for duplicates: comparing one uint64 per row is much
+cheaper than comparing every column as Python objects. Hashing is done with
+pandas' vectorized ``hash_pandas_object``, which hashes strings and
+categoricals by value, so the same row gets the same fingerprint whether its
+columns were read as ``object``, ``str`` or ``category``.
+
+``normalized_fingerprints`` hashes each column's distinct values once, with
+``hash_array`` (SipHash-2-4 with a fixed key), so distinct values collide
+only by chance. String values are normalized on their Arrow buffers when
+pyarrow is available, and columns of mostly distinct strings are hashed
+without factorizing first, which costs more than it saves on them.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = None
+
+
+def row_fingerprints(frame, columns=None):
+    """Return a uint64 array with one fingerprint per row of ``frame``.
+
+    ``columns`` restricts (and orders) the columns that are hashed; the index
+    is never part of the fingerprint.
+    """
+    if columns is not None:
+        frame = frame[list(columns)]
+    if frame.shape[1] == 0:
+        return np.zeros(len(frame), dtype=np.uint64)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+# Hash given to missing values in normalized_fingerprints
+_MISSING = np.uint64(0x9E3779B97F4A7C15)
+
+# Multiplier used to combine per-column hashes (the one pandas uses)
+_MULTIPLIER = np.uint64(1000003)
+
+# Version of the normalized fingerprints, stored with persisted indexes so
+# that fingerprints of different hashes are never mixed: 1 is hash_array of
+# values stripped in Python (used without pyarrow), 3 hash_array of values
+# stripped by Arrow. 2 was a polynomial byte hash with structural collisions.
+FINGERPRINT_VERSION = 3 if pa is not None else 1
+
+
+def _string_hashes(array):
+    """uint64 hash of each string in the Arrow ``array``; nulls get _MISSING.
+
+    The values are hashed one by one with hash_array, skipping the
+    factorization it would otherwise start with.
+    """
+    values = array.to_numpy(zero_copy_only=False)
+    result = pd.util.hash_array(values, categorize=False)
+    if array.null_count:
+        result[array.is_null().to_numpy(zero_copy_only=False)] = _MISSING
+    return result
+
+
+def _arrow_strings(values):
+    """``values`` as an Arrow string array, or None if they are not all strings."""
+    if pa is None or isinstance(values.dtype, pd.CategoricalDtype):
+        return None
+    if isinstance(values.dtype, pd.StringDtype):
+        return pa.array(values.array)
+    if not pd.api.types.is_object_dtype(values.dtype):
+        return None
+    if pd.api.types.infer_dtype(values, skipna=True) != 'string':
+        return None
+    return pa.array(np.asarray(values, dtype=object), type=pa.large_string(), from_pandas=True)
+
+
+def _normalize_strings(array, casefold):
+    """Strip surrounding whitespace (and optionally case) from an Arrow string array."""
+    array = pc.utf8_trim_whitespace(array)
+    if casefold:
+        values = pd.Series(array.to_numpy(zero_copy_only=False), dtype=object)
+        array = pa.array(values.str.casefold().to_numpy(dtype=object),
+                         type=pa.large_string(), from_pandas=True)
+    return array
+
+
+def _normalize(uniques, casefold):
+    """Strip surrounding whitespace (and optionally case) from string values."""
+    if pd.api.types.infer_dtype(uniques, skipna=True) != 'string':
+        return uniques
+    values = pd.Series(uniques, dtype=object).str.strip()
+    if casefold:
+        values = values.str.casefold()
+    return values.to_numpy(dtype=object)
+
+
+def _mostly_distinct(values, sample=10_000):
+    """Whether most values of a column are distinct, judged on an even sample."""
+    step = max(1, len(values) // sample)
+    head = values.iloc[::step]
+    return len(head) > 0 and len(pd.unique(head)) > len(head) // 2
+
+
+def column_fingerprints(values, normalize=True, casefold=False):
+    """Hash one column of a frame.
+
+    Columns with many repeated values are factorized so that each distinct
+    value is normalized and hashed only once. Integer columns, and string
+    columns whose values are mostly distinct (such as App), are hashed
+    directly, since factorizing them would cost more than it saves. Both ways
+    give a value the same hash.
+    """
+    values = pd.Series(values, copy=False)
+    if pd.api.types.is_integer_dtype(values) and not pd.api.types.is_extension_array_dtype(values):
+        return pd.util.hash_array(values.to_numpy())
+    strings = _arrow_strings(values) if _mostly_distinct(values) else None
+    if strings is not None:
+        if normalize:
+            strings = _normalize_strings(strings, casefold)
+        return _string_hashes(strings)
+    codes, uniques = pd.factorize(values)
+    if isinstance(uniques.dtype, pd.CategoricalDtype):
+        uniques = np.asarray(uniques)
+    strings = _arrow_strings(pd.Series(uniques))
+    if strings is not None:
+        if normalize:
+            strings = _normalize_strings(strings, casefold)
+        hashes = _string_hashes(strings)
+    else:
+        if normalize:
+            uniques = _normalize(uniques, casefold)
+        hashes = pd.util.hash_array(np.asarray(uniques))
+    # Missing values have code -1, which picks _MISSING
+    return np.append(hashes, _MISSING)[codes]
+
+
+def normalized_fingerprints(frame, columns=None, normalize=True, casefold=False):
+    """Row fingerprints over normalized values of ``columns``.
+
+    Unlike row_fingerprints, string values that differ only in surrounding
+    whitespace (or in case, with ``casefold=True``) get the same fingerprint.
+    """
+    if columns is None:
+        columns = frame.columns
+    result = np.zeros(len(frame), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for col in columns:
+            result = result * _MULTIPLIER ^ column_fingerprints(
+                frame[col], normalize=normalize, casefold=casefold)
+    return result
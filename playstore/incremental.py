@@ -0,0 +1,257 @@
+"""Incremental updates of the notebook's aggregates from daily snapshots.
+
+Every snapshot of apps.csv is mostly the same as the one before it. Rather
+than re-running dedup, cleaning and every aggregate on the whole store, a
+``SnapshotState`` keeps, for the last snapshot seen:
+
+* one fingerprint per distinct row, with the few cleaned fields the
+  aggregates need, and
+* the aggregates themselves: apps and average rating per category, and the
+  installs distribution of paid and free apps (sections 4, 5 and 9).
+
+A new snapshot is fingerprinted, compared with the stored fingerprints, and
+only the inserted rows are cleaned. Aggregates are updated by subtracting the
+deleted rows and adding the inserted ones, so apart from hashing the new file
+the work is proportional to the size of the change. An app whose row changed
+shows up as one deleted and one inserted row and is reported as updated.
+
+Reviews are handled the same way, keyed on review fingerprints with their
+multiplicity (the same review can appear several times), to keep per-app
+sentiment totals (section 10).
+"""
+
+import os
+import pickle
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from playstore.cleaning import clean_apps
+from playstore.hashing import row_fingerprints
+from playstore.loading import APPS_SCHEMA, REVIEWS_SCHEMA
+
+# Cleaned fields kept for every stored app row, and their dtypes
+APP_FIELDS = ['App', 'Category', 'Type', 'Rating', 'Installs', 'Price']
+APP_DTYPES = {'App': object, 'Category': object, 'Type': object,
+              'Rating': np.float64, 'Installs': np.float64, 'Price': np.float64}
+
+# Fields kept for every stored review, and their dtypes
+REVIEW_FIELDS = ['App', 'Sentiment', 'Sentiment_Polarity', 'Sentiment_Subjectivity']
+REVIEW_DTYPES = {'App': object, 'Sentiment': object, 'Sentiment_Polarity': np.float64,
+                 'Sentiment_Subjectivity': np.float64, 'n': np.int64}
+
+# Sentiment labels counted per app
+SENTIMENTS = ['Positive', 'Neutral', 'Negative']
+
+# Result of applying a snapshot: inserted and deleted rows, and the names of
+# apps present in both (i.e. changed in place)
+Delta = namedtuple('Delta', ['inserted', 'deleted', 'updated'])
+
+
+def _add(total, part, sign, count=None):
+    """Add ``sign * part`` to ``total`` and drop groups whose count reaches zero.
+
+    For frames ``count`` names the integer column holding the number of rows
+    in each group; float sums can keep a rounding residue after all of a
+    group's rows are removed, so they are not looked at. ``add`` with a fill
+    value returns floats, so the result is cast back to the dtypes of
+    ``part`` to keep counts int64.
+    """
+    part = part * sign
+    if total is not None:
+        dtypes = part.dtypes.to_dict() if isinstance(part, pd.DataFrame) else part.dtype
+        total = total.add(part, fill_value=0).astype(dtypes)
+    else:
+        total = part
+    if isinstance(total, pd.DataFrame):
+        return total[total[count] != 0]
+    return total[total != 0]
+
+
+def _empty_rows(dtypes):
+    """Empty frame of stored rows with the given column dtypes, keyed by fingerprint."""
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in dtypes.items()},
+                        index=pd.Index([], dtype=np.uint64))
+
+
+def _snapshot_columns(frame, schema):
+    """Columns of ``frame`` that belong to the file's schema.
+
+    apps.csv starts with an unnamed positional index; it is left out so that
+    removing one row does not change the fingerprint of every later row.
+    """
+    return [col for col in schema if col in frame.columns]
+
+
+class AppAggregates:
+    """Per-category counts and rating sums, and installs counts per Type."""
+
+    def __init__(self):
+        self.by_category = None
+        self.installs_by_type = None
+
+    def apply(self, rows, sign=1):
+        """Add (``sign=1``) or remove (``sign=-1``) the contribution of ``rows``."""
+        if len(rows) == 0:
+            return self
+        rating = rows['Rating']
+        part = pd.DataFrame({
+            'count': 1,
+            'rating_sum': rating.fillna(0),
+            'rating_count': rating.notna().astype(np.int64),
+        }).groupby(rows['Category'].to_numpy()).sum()
+        self.by_category = _add(self.by_category, part, sign, count='count')
+        part = rows.groupby(['Type', 'Installs'], observed=True).size()
+        self.installs_by_type = _add(self.installs_by_type, part, sign)
+        return self
+
+    def category_counts(self):
+        """Apps per category, largest first (section 4)."""
+        return self.by_category['count'].astype(np.int64).sort_values(ascending=False)
+
+    def average_rating(self):
+        """Average rating over all apps (section 5)."""
+        table = self.by_category
+        return table['rating_sum'].sum() / table['rating_count'].sum()
+
+    def category_rating(self):
+        """Average rating per category."""
+        table = self.by_category
+        return table['rating_sum'] / table['rating_count']
+
+    def installs_distribution(self, app_type):
+        """Number of apps of ``app_type`` at each Installs value (section 9)."""
+        return self.installs_by_type.xs(app_type, level='Type').astype(np.int64)
+
+
+class ReviewAggregates:
+    """Number of reviews, polarity/subjectivity sums and sentiment counts per app."""
+
+    def __init__(self):
+        self.by_app = None
+
+    def apply(self, rows, sign=1):
+        """Add or remove reviews; ``rows['n']`` holds each review's multiplicity."""
+        if len(rows) == 0:
+            return self
+        n = rows['n']
+        part = {
+            'reviews': n,
+            'polarity_sum': rows['Sentiment_Polarity'].fillna(0) * n,
+            'subjectivity_sum': rows['Sentiment_Subjectivity'].fillna(0) * n,
+        }
+        for label in SENTIMENTS:
+            part[label] = (rows['Sentiment'] == label).astype(np.int64) * n
+        part = pd.DataFrame(part).groupby(rows['App'].to_numpy()).sum()
+        self.by_app = _add(self.by_app, part, sign, count='reviews')
+        return self
+
+    def per_app(self):
+        """Per-app sentiment totals with mean polarity and subjectivity.
+
+        Before any review has been applied the table is empty.
+        """
+        if self.by_app is None:
+            counts = ['reviews'] + SENTIMENTS
+            columns = ['reviews', 'polarity_sum', 'subjectivity_sum'] + SENTIMENTS
+            return pd.DataFrame(
+                {col: pd.Series(dtype=np.int64 if col in counts else np.float64)
+                 for col in columns + ['polarity_mean', 'subjectivity_mean']},
+                index=pd.Index([], dtype=object, name='App'))
+        table = self.by_app.copy()
+        table['polarity_mean'] = table['polarity_sum'] / table['reviews']
+        table['subjectivity_mean'] = table['subjectivity_sum'] / table['reviews']
+        table.index.name = 'App'
+        return table
+
+
+class SnapshotState:
+    """Fingerprints and aggregates of the last snapshot, persisted in a directory."""
+
+    FILENAME = 'snapshot_state.pkl'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.app_rows = _empty_rows(APP_DTYPES)
+        self.review_rows = _empty_rows(REVIEW_DTYPES)
+        self.apps = AppAggregates()
+        self.reviews = ReviewAggregates()
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, self.FILENAME)
+
+    @classmethod
+    def load(cls, directory):
+        """Load the state saved in ``directory``, or an empty state."""
+        state = cls(directory)
+        if os.path.exists(state.path):
+            with open(state.path, 'rb') as f:
+                state.__dict__.update(pickle.load(f))
+            state.directory = directory
+        return state
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump({key: value for key, value in self.__dict__.items()
+                         if key != 'directory'}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+
+    def update_apps(self, apps_with_duplicates):
+        """Apply a new raw apps snapshot and return the Delta against the last one.
+
+        Duplicate rows collapse onto one fingerprint, as with drop_duplicates.
+        Only the apps.csv columns are fingerprinted, not its positional index.
+        """
+        fingerprints = row_fingerprints(
+            apps_with_duplicates, _snapshot_columns(apps_with_duplicates, APPS_SCHEMA))
+        distinct = ~pd.Index(fingerprints).duplicated()
+        fingerprints = fingerprints[distinct]
+        old = self.app_rows
+        is_new = ~pd.Index(fingerprints).isin(old.index)
+        deleted = old[~old.index.isin(fingerprints)]
+
+        # Only rows not seen before are cleaned
+        new_rows = apps_with_duplicates[distinct][is_new]
+        inserted = clean_apps(new_rows, columns=['Installs', 'Price'])[APP_FIELDS]
+        inserted = inserted.astype(APP_DTYPES)
+        inserted.index = pd.Index(fingerprints[is_new], dtype=np.uint64)
+
+        self.apps.apply(deleted, sign=-1).apply(inserted, sign=1)
+        kept = old.drop(index=deleted.index)
+        self.app_rows = pd.concat([kept, inserted]) if len(kept) else inserted
+        updated = pd.Index(deleted['App']).intersection(pd.Index(inserted['App']))
+        return Delta(inserted, deleted, updated)
+
+    def update_reviews(self, reviews_df):
+        """Apply a new reviews snapshot and return the Delta against the last one.
+
+        Reviews without a Sentiment or Review are skipped, as in section 10.
+        """
+        reviews_df = reviews_df.dropna(subset=['Sentiment', 'Review'])
+        fingerprints = pd.Index(row_fingerprints(
+            reviews_df, _snapshot_columns(reviews_df, REVIEWS_SCHEMA)), dtype=np.uint64)
+        multiplicity = fingerprints.value_counts()
+        first = ~fingerprints.duplicated()
+        current = reviews_df[REVIEW_FIELDS][first].copy()
+        current.index = fingerprints[first]
+        current['n'] = multiplicity.reindex(current.index).to_numpy()
+        current = current.astype(REVIEW_DTYPES)
+
+        old = self.review_rows
+        change = current['n'].sub(old['n'], fill_value=0).astype(np.int64)
+        change = change[change != 0]
+        # A review whose count grew is in the new snapshot, one whose count
+        # shrank is in the old one
+        inserted = current.loc[change.index[change > 0]].copy()
+        inserted['n'] = change[change > 0].to_numpy()
+        deleted = old.loc[change.index[change < 0]].copy()
+        deleted['n'] = -change[change < 0].to_numpy()
+
+        self.reviews.apply(deleted, sign=-1).apply(inserted, sign=1)
+        self.review_rows = current
+        updated = pd.Index(deleted['App']).intersection(pd.Index(inserted['App']))
+        return Delta(inserted, deleted, updated)
@@ -0,0 +1,203 @@
+"""Typed loading of apps.csv and user_reviews.csv with a columnar cache.
+
+``pd.read_csv`` with no dtypes leaves every text column as ``object`` and
+re-parses the whole file on every run. The loaders below declare the schema of
+both files up front, parse once, and write the result to an uncompressed Arrow
+IPC file next to the source. The cache file name carries a hash of the source
+bytes and of the schema, so an edited CSV or a schema change simply misses the
+cache. Later runs read the Arrow file instead of parsing the CSV. The digest
+of each source is remembered with its size and modification time, so a cache
+hit only hashes the CSV again when one of those has changed.
+
+Arrow IPC is used rather than Parquet because it is read without decoding:
+the cache file is memory-mapped and the frame's string columns keep pointing
+into the mapping. Numeric and categorical columns are copied into NumPy
+arrays by default, because that is what the notebook and playstore.cleaning
+expect. Pass ``dtype_backend='pyarrow'`` to keep the numeric columns as
+ArrowDtype views of the mapped buffers as well, so a cache hit allocates
+almost nothing; categoricals are still converted. pyarrow is optional:
+without it the loaders still apply the schema but always parse the CSV.
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = None
+
+# Default locations, matching the paths used in the notebook
+APPS_CSV = os.path.join('datasets', 'apps.csv')
+REVIEWS_CSV = os.path.join('datasets', 'user_reviews.csv')
+
+# Directory (relative to the source file) holding cached Arrow files
+CACHE_DIR = '.cache'
+
+# Schema of apps.csv. Installs and Price stay strings here; they are parsed by
+# playstore.cleaning so that the raw values remain available.
+APPS_SCHEMA = {
+    'App': 'str',
+    'Category': 'category',
+    'Rating': 'float64',
+    'Reviews': 'int64',
+    'Size': 'float64',
+    'Installs': 'str',
+    'Type': 'category',
+    'Price': 'str',
+    'Content Rating': 'category',
+    'Genres': 'category',
+    'Last Updated': 'str',
+    'Current Ver': 'str',
+    'Android Ver': 'str',
+}
+
+# Schema of user_reviews.csv
+REVIEWS_SCHEMA = {
+    'App': 'str',
+    'Review': 'str',
+    'Sentiment': 'category',
+    'Sentiment_Polarity': 'float64',
+    'Sentiment_Subjectivity': 'float64',
+}
+
+# Read size used when hashing source files
+_HASH_CHUNK = 1 << 20
+
+
+def file_digest(path):
+    """Return a hex digest of the file's bytes."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _schema_digest(schema):
+    text = repr(sorted(schema.items()))
+    return hashlib.blake2b(text.encode(), digest_size=4).hexdigest()
+
+
+def source_digest(path, cache_dir):
+    """Return ``file_digest(path)``, reusing the last one if the file looks unchanged.
+
+    The digest is stored in ``cache_dir`` together with the file's path, size
+    and modification time, and only recomputed when any of them differs.
+    """
+    info = os.stat(path)
+    stamp = {'path': os.path.abspath(path), 'size': info.st_size,
+             'mtime_ns': info.st_mtime_ns}
+    stem = os.path.splitext(os.path.basename(path))[0]
+    stamp_path = os.path.join(cache_dir, f'{stem}.digest.json')
+    try:
+        with open(stamp_path) as f:
+            saved = json.load(f)
+        if all(saved.get(key) == value for key, value in stamp.items()):
+            return saved['digest']
+    except (OSError, ValueError, KeyError):
+        pass
+    stamp['digest'] = file_digest(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = stamp_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(stamp, f)
+        os.replace(tmp, stamp_path)
+    except OSError:
+        pass
+    return stamp['digest']
+
+
+def cache_path(path, schema, cache_dir=None):
+    """Return the cache file that corresponds to ``path`` read with ``schema``."""
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    name = f'{stem}-{source_digest(path, cache_dir)}-{_schema_digest(schema)}.arrow'
+    return os.path.join(cache_dir, name)
+
+
+def read_typed_csv(path, schema, **kwargs):
+    """Parse ``path`` with the declared ``schema``.
+
+    Columns in the file that are not in the schema are left for pandas to
+    infer, so an extra leading index column does not break the read.
+    """
+    return pd.read_csv(path, dtype=schema, **kwargs)
+
+
+def _write_cache(df, target):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = target + '.tmp'
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    feather.write_feather(table, tmp, compression='uncompressed')
+    # Rename so an interrupted write never leaves a truncated cache behind
+    os.replace(tmp, target)
+
+
+def _arrow_type(arrow_type):
+    # Strings already stay in Arrow as pandas' str dtype, and dictionaries
+    # become categoricals so that the .cat accessor keeps working
+    if (pa.types.is_dictionary(arrow_type) or pa.types.is_string(arrow_type)
+            or pa.types.is_large_string(arrow_type)):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+def _to_pandas(table, dtype_backend=None):
+    if dtype_backend == 'pyarrow':
+        return table.to_pandas(types_mapper=_arrow_type)
+    return table.to_pandas(split_blocks=True)
+
+
+def _read_cache(target, dtype_backend=None):
+    # The memory map lets Arrow read the table without a copy of its own, and
+    # the buffers keep the mapping alive after the file is closed
+    with pa.memory_map(target, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return _to_pandas(table, dtype_backend)
+
+
+def load_csv(path, schema, use_cache=True, cache_dir=None, dtype_backend=None):
+    """Load ``path`` with ``schema``, going through the Arrow cache if possible.
+
+    ``dtype_backend='pyarrow'`` returns numeric columns as ArrowDtype instead
+    of NumPy arrays; on a cache hit they share the memory-mapped cache file.
+    """
+    if dtype_backend not in (None, 'pyarrow'):
+        raise ValueError(f'unknown dtype_backend: {dtype_backend!r}')
+    if pa is None:
+        if dtype_backend == 'pyarrow':
+            raise ImportError("dtype_backend='pyarrow' requires pyarrow")
+        return read_typed_csv(path, schema)
+    if not use_cache:
+        df = read_typed_csv(path, schema)
+        if dtype_backend == 'pyarrow':
+            df = _to_pandas(pa.Table.from_pandas(df, preserve_index=False), dtype_backend)
+        return df
+    target = cache_path(path, schema, cache_dir)
+    if os.path.exists(target):
+        return _read_cache(target, dtype_backend)
+    df = read_typed_csv(path, schema)
+    _write_cache(df, target)
+    if dtype_backend == 'pyarrow':
+        # Read back so that a miss returns the same mapped frame as a hit
+        return _read_cache(target, dtype_backend)
+    return df
+
+
+def load_apps(path=APPS_CSV, use_cache=True, cache_dir=None, dtype_backend=None):
+    """Load apps.csv with APPS_SCHEMA."""
+    return load_csv(path, APPS_SCHEMA, use_cache=use_cache, cache_dir=cache_dir,
+                    dtype_backend=dtype_backend)
+
+
+def load_reviews(path=REVIEWS_CSV, use_cache=True, cache_dir=None, dtype_backend=None):
+    """Load user_reviews.csv with REVIEWS_SCHEMA."""
+    return load_csv(path, REVIEWS_SCHEMA, use_cache=use_cache, cache_dir=cache_dir,
+                    dtype_backend=dtype_backend)
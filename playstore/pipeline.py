@@ -0,0 +1,288 @@
+"""The notebook's analysis as a lazily evaluated graph of memoized stages.
+
+Each section of the notebook is a named stage that declares the stages it
+depends on. ``Pipeline.get(name)`` computes a stage only when it is asked for,
+and only the stages it needs. Results are memoized in memory and pickled to
+disk under a key made of the stage name, a digest of this package's source
+code and the keys of its inputs (for the load stages, a digest of the CSV
+file, which is only recomputed when the file's size or modification time
+changes; see ``loading.source_digest``). A later run with unchanged inputs and code loads the result straight
+from disk, without computing or even loading the stages behind it.
+
+Nothing here imports a plotting library; ``Pipeline.figure`` imports
+playstore.plots (and through it plotly or matplotlib) on first use, so
+headless batch jobs start fast:
+
+    python -m playstore.pipeline --apps apps.csv --reviews user_reviews.csv \
+        pricing sentiment
+
+The input files default to the notebook's ``datasets/`` paths and results are
+cached in ``--cache-dir`` (``.cache`` by default).
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+
+from playstore.loading import APPS_CSV, CACHE_DIR, REVIEWS_CSV, file_digest, source_digest
+
+# Registered stages by name
+STAGES = {}
+
+# Columns turned into categoricals by the typecast stage
+CATEGORICAL = ['Category', 'Type', 'Content Rating', 'Genres']
+
+# Categories with at least this many apps count as large (section 6)
+LARGE_CATEGORY = 250
+
+# Apps above this price are listed in section 7, and the stripplot in
+# section 8 only keeps apps below JUNK_PRICE
+EXPENSIVE_PRICE = 200
+JUNK_PRICE = 100
+
+# Categories drawn in the section 7 and 8 stripplots
+POPULAR_CATEGORIES = ['GAME', 'FAMILY', 'PHOTOGRAPHY', 'MEDICAL', 'TOOLS',
+                      'FINANCE', 'LIFESTYLE', 'BUSINESS']
+
+
+class Stage:
+    """A named step of the analysis and the names of the stages it reads."""
+
+    def __init__(self, name, func, deps=(), source=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        # Pipeline attribute naming the input file, for stages that read one
+        self.source = source
+
+    def __repr__(self):
+        return f'Stage({self.name!r}, deps={self.deps!r})'
+
+
+def stage(name, deps=(), source=None):
+    """Register the decorated function as the stage ``name``.
+
+    The function is called with the pipeline followed by the results of
+    ``deps``, in order.
+    """
+    def register(func):
+        STAGES[name] = Stage(name, func, deps, source)
+        return func
+    return register
+
+
+_code_version = None
+
+
+def code_version():
+    """Digest of the package's source files; any code change invalidates caches."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.blake2b(digest_size=8)
+        package = os.path.dirname(os.path.abspath(__file__))
+        for name in sorted(os.listdir(package)):
+            if name.endswith('.py'):
+                with open(os.path.join(package, name), 'rb') as f:
+                    digest.update(name.encode())
+                    digest.update(f.read())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+class Pipeline:
+    """Lazy, memoized evaluation of STAGES for one pair of input files.
+
+    ``cache_dir=None`` keeps results in memory only.
+    """
+
+    def __init__(self, apps_path=APPS_CSV, reviews_path=REVIEWS_CSV,
+                 cache_dir=CACHE_DIR):
+        self.apps_path = apps_path
+        self.reviews_path = reviews_path
+        self.cache_dir = cache_dir
+        self._results = {}
+        self._keys = {}
+
+    def key(self, name):
+        """Cache key of a stage, computed without running anything."""
+        if name not in self._keys:
+            stage = STAGES[name]
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(name.encode())
+            digest.update(code_version().encode())
+            if stage.source is not None:
+                digest.update(self._source_digest(getattr(self, stage.source)).encode())
+            for dep in stage.deps:
+                digest.update(self.key(dep).encode())
+            self._keys[name] = digest.hexdigest()
+        return self._keys[name]
+
+    def _source_digest(self, path):
+        if self.cache_dir is None:
+            return file_digest(path)
+        return source_digest(path, self.cache_dir)
+
+    def _cache_file(self, name):
+        return os.path.join(self.cache_dir, f'stage-{name}-{self.key(name)}.pkl')
+
+    def get(self, name):
+        """Result of stage ``name``, computing its missing inputs first."""
+        if name in self._results:
+            return self._results[name]
+        path = None if self.cache_dir is None else self._cache_file(name)
+        if path is not None and os.path.exists(path):
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        else:
+            stage = STAGES[name]
+            result = stage.func(self, *[self.get(dep) for dep in stage.deps])
+            if path is not None:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(path + '.tmp', 'wb') as f:
+                    pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(path + '.tmp', path)
+        self._results[name] = result
+        return result
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def figure(self, name, **kwargs):
+        """Draw the figure of a stage; plotting libraries are imported here."""
+        from playstore import plots
+
+        return FIGURES[name](plots, self.get(name), **kwargs)
+
+
+@stage('load', source='apps_path')
+def load(pipeline):
+    """Section 1: apps.csv with duplicates."""
+    from playstore.loading import load_apps
+
+    return load_apps(pipeline.apps_path, cache_dir=pipeline.cache_dir)
+
+
+@stage('dedup', deps=['load'])
+def dedup(pipeline, apps_with_duplicates):
+    """Section 1: drop duplicate rows."""
+    from playstore.dedup import deduplicate
+
+    return deduplicate(apps_with_duplicates, normalize=False)
+
+
+@stage('clean', deps=['dedup'])
+def clean(pipeline, apps):
+    """Sections 2 and 3: Installs and Price parsed to floats."""
+    from playstore.cleaning import clean_apps
+
+    return clean_apps(apps, columns=['Installs', 'Price'])
+
+
+@stage('typecast', deps=['clean'])
+def typecast(pipeline, apps):
+    """Remaining typed columns: Size, Reviews, Last Updated and categoricals."""
+    from playstore.cleaning import clean_apps
+
+    apps = clean_apps(apps, columns=['Size', 'Reviews', 'Last Updated'])
+    for col in CATEGORICAL:
+        apps[col] = apps[col].astype('category')
+    return apps
+
+
+@stage('category_stats', deps=['typecast'])
+def category_stats(pipeline, apps):
+    """Section 4: per-category counts and moments."""
+    from playstore.categories import CategoryStats
+
+    return CategoryStats.from_frame(apps)
+
+
+@stage('rating_distribution', deps=['typecast'])
+def rating_distribution(pipeline, apps):
+    """Section 5: average rating and the rating histogram."""
+    from playstore.sketches import rating_histogram
+
+    return {
+        'avg_app_rating': apps['Rating'].mean(),
+        'histogram': rating_histogram().update(apps['Rating']),
+    }
+
+
+@stage('pricing', deps=['typecast', 'category_stats'])
+def pricing(pipeline, apps, stats):
+    """Sections 6 to 9: large categories, expensive apps and paid vs. free installs."""
+    from playstore.sketches import installs_by_type
+
+    popular = apps[stats.mask(POPULAR_CATEGORIES)]
+    return {
+        'large_categories': list(stats.large(LARGE_CATEGORY)),
+        'apps_above_200': apps[apps['Price'] > EXPENSIVE_PRICE][['Category', 'App', 'Price']],
+        'popular_app_cats': popular[['Category', 'App', 'Price']],
+        'apps_under_100': popular[popular['Price'] < JUNK_PRICE][['Category', 'App', 'Price']],
+        'installs_by_type': installs_by_type().update(apps),
+    }
+
+
+@stage('reviews', source='reviews_path')
+def reviews(pipeline):
+    """Digest of user_reviews.csv; the reviews themselves are streamed."""
+    return pipeline.reviews_path
+
+
+@stage('sentiment', deps=['typecast', 'reviews'])
+def sentiment(pipeline, apps, reviews_path):
+    """Section 10: sentiment polarity of reviews for paid vs. free apps."""
+    from playstore.reviews import GroupedMoments, stream_reviews
+    from playstore.sketches import polarity_by_type
+
+    polarity, moments = stream_reviews(
+        apps, [polarity_by_type(), GroupedMoments('Type', 'Sentiment_Polarity')],
+        path=reviews_path)
+    return {'polarity_by_type': polarity, 'polarity_moments': moments.result()}
+
+
+@stage('review_sentiment', deps=['typecast', 'reviews'])
+def review_sentiment(pipeline, apps, reviews_path):
+    """Section 10 for new scrapes: reviews re-scored from their text.
+
+    Per-app totals are indexed by App, so they join onto ``apps``; they are
+    rolled up per category as well. Text scores are cached in cache_dir.
+    """
+    from playstore.sentiment import category_sentiment, score_file
+
+    per_app = score_file(reviews_path, cache_dir=pipeline.cache_dir)
+    return {'per_app': per_app, 'per_category': category_sentiment(per_app, apps)}
+
+
+# How to draw the figure of a stage from its result, given playstore.plots
+FIGURES = {
+    'rating_distribution': lambda plots, result: plots.rating_figure(
+        result['histogram'], result['avg_app_rating']),
+    'pricing': lambda plots, result: plots.installs_figure(result['installs_by_type']),
+    'sentiment': lambda plots, result, ax=None: plots.draw_boxplot(
+        result['polarity_by_type'], ax=ax),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('stages', nargs='*', metavar='STAGE',
+                        help=f"stages to print (default: all of {', '.join(STAGES)})")
+    parser.add_argument('--apps', default=APPS_CSV, help='path of apps.csv')
+    parser.add_argument('--reviews', default=REVIEWS_CSV, help='path of user_reviews.csv')
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help='directory for cached stage results')
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.stages if name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    pipeline = Pipeline(args.apps, args.reviews, cache_dir=args.cache_dir)
+    for name in args.stages or list(STAGES):
+        print(f'== {name}')
+        print(pipeline.get(name))
+
+
+if __name__ == '__main__':
+    main()
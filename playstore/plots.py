@@ -0,0 +1,174 @@
+"""Figures for the notebook's charts, drawn from summaries instead of raw rows.
+
+The traces here carry only bin counts and box statistics, so the figure size
+and render time do not depend on the number of rows behind them. plotly and
+matplotlib are imported inside the functions that need them, so importing
+this module does not pull in a plotting library.
+
+The size-vs-rating and price-vs-rating jointplots (section 6) and the category
+stripplots (sections 7 and 8) draw one marker per app. ``jointplot`` and
+``stripplot`` keep the notebook's charts for small inputs, and above
+``MAX_POINTS`` switch to hexbin densities or a stratified sample.
+"""
+
+import numpy as np
+import pandas as pd
+
+from playstore.sketches import box_stats
+
+# Above this many points, scatter-style charts are drawn as density rasters
+MAX_POINTS = 50_000
+
+
+def rating_histogram_trace(hist):
+    """Bar trace equivalent to section 5's ``go.Histogram(x=apps['Rating'])``."""
+    import plotly.graph_objs as go
+
+    centers = (hist.edges[:-1] + hist.edges[1:]) / 2
+    return go.Bar(x=centers, y=hist.counts, width=np.diff(hist.edges),
+                  name='Rating')
+
+
+def rating_figure(hist, avg_app_rating):
+    """Section 5 figure: rating histogram with a dashed line at the mean."""
+    return {
+        'data': [rating_histogram_trace(hist)],
+        'layout': {'shapes': [{
+            'type': 'line',
+            'x0': avg_app_rating,
+            'y0': 0,
+            'x1': avg_app_rating,
+            'y1': int(hist.counts.max()) if len(hist.counts) else 0,
+            'line': {'dash': 'dashdot'},
+        }]},
+    }
+
+
+def box_traces(grouped, names=None):
+    """One precomputed ``go.Box`` trace per group of a Grouped summary.
+
+    The outliers of each group follow its box as a marker trace.
+    """
+    import plotly.graph_objs as go
+
+    if names is None:
+        names = list(grouped.summaries)
+    traces = []
+    for name in names:
+        stats = box_stats(grouped.summaries[name])
+        traces.append(go.Box(
+            name=name, x=[name],
+            q1=[stats['q1']], median=[stats['med']], q3=[stats['q3']],
+            lowerfence=[stats['whislo']], upperfence=[stats['whishi']],
+        ))
+        if len(stats['fliers']):
+            traces.append(go.Scatter(
+                x=[name] * len(stats['fliers']), y=stats['fliers'],
+                mode='markers', name=name, showlegend=False,
+            ))
+    return traces
+
+
+def installs_figure(grouped):
+    """Section 9 figure: installs of paid vs. free apps on a log axis."""
+    import plotly.graph_objs as go
+
+    layout = go.Layout(
+        title='Number of downloads of paid vs. free apps',
+        yaxis=dict(title='Log number of downloads', type='log', autorange=True),
+    )
+    return {'data': box_traces(grouped, names=['Paid', 'Free']), 'layout': layout}
+
+
+def draw_boxplot(grouped, ax=None, names=None):
+    """Matplotlib box plot of a Grouped summary, as in section 10's sns.boxplot."""
+    if ax is None:
+        import matplotlib.pyplot as plt
+        ax = plt.gca()
+    if names is None:
+        names = list(grouped.summaries)
+    stats = []
+    for name in names:
+        box = box_stats(grouped.summaries[name])
+        box['label'] = name
+        stats.append(box)
+    ax.bxp(stats)
+    ax.set_xlabel(grouped.group)
+    ax.set_ylabel(grouped.value)
+    return ax
+
+
+def stratified_sample(frame, by, n, keep=None, seed=0):
+    """Sample about ``n`` rows of ``frame``, the same share from each group of ``by``.
+
+    Rows selected by the boolean mask ``keep`` (e.g. the apps priced above
+    $200 in section 7) are always included, on top of the sample.
+    """
+    if len(frame) <= n:
+        return frame
+    rng = np.random.default_rng(seed)
+    keep = np.zeros(len(frame), dtype=bool) if keep is None else np.asarray(keep)
+    # One uniform draw per row; a row is kept if its draw is below the group's rate
+    codes, groups = pd.factorize(frame[by])
+    sizes = np.bincount(codes[codes >= 0], minlength=len(groups))
+    rate = min(1.0, n / len(frame))
+    # Every group keeps at least one row so small categories stay visible
+    group_rate = np.maximum(rate, 1.0 / np.maximum(sizes, 1))
+    draw = rng.random(len(frame))
+    chosen = keep | (draw < np.where(codes >= 0, group_rate[codes], rate))
+    return frame[chosen]
+
+
+def draw_density(x, y, ax=None, max_points=MAX_POINTS, gridsize=60, **kwargs):
+    """Scatter ``y`` against ``x``, or a hexbin density above ``max_points``."""
+    if ax is None:
+        import matplotlib.pyplot as plt
+        ax = plt.gca()
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) <= max_points:
+        ax.scatter(x, y, s=kwargs.pop('s', 10), **kwargs)
+    else:
+        ax.hexbin(x, y, gridsize=gridsize, mincnt=1, bins='log',
+                  cmap=kwargs.pop('cmap', 'Blues'), **kwargs)
+    return ax
+
+
+def jointplot(x, y, max_points=MAX_POINTS, bins=50, gridsize=60):
+    """Stand-in for ``sns.jointplot`` that stays bounded on large inputs.
+
+    Small inputs go to seaborn unchanged. Above ``max_points`` pairs without
+    a missing value, the joint panel is a hexbin and the margins are
+    histograms of counts computed with numpy, so no per-point artist is
+    created.
+    """
+    import seaborn as sns
+
+    x_values = np.asarray(x, dtype=np.float64)
+    y_values = np.asarray(y, dtype=np.float64)
+    present = ~(np.isnan(x_values) | np.isnan(y_values))
+    if present.sum() <= max_points:
+        return sns.jointplot(x=x, y=y)
+    grid = sns.JointGrid()
+    x_values, y_values = x_values[present], y_values[present]
+    draw_density(x_values, y_values, ax=grid.ax_joint, max_points=max_points,
+                 gridsize=gridsize)
+    x_counts, x_edges = np.histogram(x_values, bins=bins)
+    y_counts, y_edges = np.histogram(y_values, bins=bins)
+    grid.ax_marg_x.stairs(x_counts, x_edges, fill=True)
+    grid.ax_marg_y.stairs(y_counts, y_edges, fill=True, orientation='horizontal')
+    grid.set_axis_labels(getattr(x, 'name', None) or '', getattr(y, 'name', None) or '')
+    return grid
+
+
+def stripplot(frame, x, y, ax=None, max_points=MAX_POINTS, keep=None, **kwargs):
+    """``sns.stripplot`` of ``frame`` with a stratified sample above ``max_points``.
+
+    The sample keeps the same share of every ``y`` category, plus all rows in
+    ``keep``, so outliers like ``apps_above_200`` are still drawn.
+    """
+    import seaborn as sns
+
+    sample = stratified_sample(frame, y, max_points, keep=keep)
+    return sns.stripplot(x=sample[x], y=sample[y], ax=ax, jitter=True,
+                         linewidth=1, **kwargs)
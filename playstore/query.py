@@ -0,0 +1,410 @@
+"""Precomputed answers to the notebook's questions, for dashboards.
+
+Each question in the notebook rescans the whole frame with a boolean mask:
+apps per category, the average rating, apps above a price
+(``apps[apps['Price'] > 200]``, ``popular_app_cats[... < 100]``), paid vs.
+free installs and polarity by Type. ``QueryService`` builds once:
+
+* a ``SortedIndex`` on each of Price, Rating, Installs and Size, and one
+  per category, so range filters and top-k are binary searches plus a slice,
+* per-category statistics (playstore.categories), and
+* per-Type installs and polarity box statistics,
+
+and then answers queries without touching rows outside the result. Requests
+are plain dicts (``{'op': 'range', 'column': 'Price', 'low': 200}``) and
+answers are JSON-serializable, so the same ``handle`` backs the in-process
+``LocalClient``, the HTTP server from ``serve`` and ``HTTPClient``.
+"""
+
+import json
+import math
+import operator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlparse
+from urllib.request import urlopen
+
+import numpy as np
+import pandas as pd
+
+from playstore.categories import CategoryStats
+from playstore.sketches import box_stats, installs_by_type
+
+# Columns with a sorted index
+INDEXED = ['Price', 'Rating', 'Installs', 'Size']
+
+# Columns returned for each matching app unless others are asked for
+DEFAULT_COLUMNS = ['Category', 'App', 'Price', 'Rating', 'Installs', 'Size']
+
+# Most rows returned by one query
+LIMIT = 100
+
+
+class QueryError(ValueError):
+    """A request with an unknown operation, column or category, or a bad argument."""
+
+
+class SortedIndex:
+    """Row positions of a column sorted by value; missing values are left out."""
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        rows = np.flatnonzero(~np.isnan(values))
+        order = np.argsort(values[rows], kind='stable')
+        self.rows = rows[order].astype(np.int32)
+        self.values = values[self.rows]
+
+    def bounds(self, low=None, high=None, include_low=True, include_high=True):
+        """Slice of ``rows`` whose values lie between ``low`` and ``high``."""
+        start = 0 if low is None else np.searchsorted(
+            self.values, low, side='left' if include_low else 'right')
+        stop = len(self.values) if high is None else np.searchsorted(
+            self.values, high, side='right' if include_high else 'left')
+        return slice(int(start), int(max(start, stop)))
+
+    def range(self, low=None, high=None, include_low=True, include_high=True):
+        return self.rows[self.bounds(low, high, include_low, include_high)]
+
+    def top(self, k, largest=True):
+        """Rows of the ``k`` largest (or smallest) values, in that order."""
+        if largest:
+            return self.rows[::-1][:k]
+        return self.rows[:k]
+
+
+class GroupedSortedIndex:
+    """A SortedIndex per group, stored as consecutive segments of one array.
+
+    Range and top-k queries over a set of groups search each group's segment
+    and merge at most ``limit`` rows from each, so they never visit rows
+    outside the answer.
+    """
+
+    def __init__(self, values, codes, n_groups):
+        values = np.asarray(values, dtype=np.float64)
+        rows = np.flatnonzero(~np.isnan(values) & (codes >= 0))
+        order = np.lexsort((values[rows], codes[rows]))
+        self.rows = rows[order].astype(np.int32)
+        self.values = values[self.rows]
+        self.offsets = np.searchsorted(codes[self.rows], np.arange(n_groups + 1))
+
+    def _segment(self, code):
+        return slice(int(self.offsets[code]), int(self.offsets[code + 1]))
+
+    def range(self, codes, low=None, high=None, include_low=True,
+              include_high=True, limit=LIMIT):
+        """Return (number of matches, first ``limit`` matching rows by value)."""
+        count = 0
+        parts = []
+        for code in codes:
+            segment = self._segment(code)
+            values = self.values[segment]
+            start = 0 if low is None else np.searchsorted(
+                values, low, side='left' if include_low else 'right')
+            stop = len(values) if high is None else np.searchsorted(
+                values, high, side='right' if include_high else 'left')
+            stop = max(start, stop)
+            count += stop - start
+            head = slice(segment.start + start, segment.start + min(stop, start + limit))
+            parts.append((self.values[head], self.rows[head]))
+        return int(count), _merge(parts, limit, largest=False)
+
+    def top(self, codes, k, largest=True):
+        parts = []
+        for code in codes:
+            segment = self._segment(code)
+            if largest:
+                head = slice(max(segment.start, segment.stop - k), segment.stop)
+                parts.append((self.values[head][::-1], self.rows[head][::-1]))
+            else:
+                head = slice(segment.start, min(segment.stop, segment.start + k))
+                parts.append((self.values[head], self.rows[head]))
+        return _merge(parts, k, largest=largest)
+
+
+def _merge(parts, limit, largest):
+    """Merge (values, rows) pairs and keep the ``limit`` first by value."""
+    if not parts:
+        return np.empty(0, dtype=np.int32)
+    values = np.concatenate([values for values, _ in parts])
+    rows = np.concatenate([rows for _, rows in parts])
+    order = np.argsort(-values if largest else values, kind='stable')[:limit]
+    return rows[order]
+
+
+def _jsonable(value):
+    """Convert numpy scalars and NaN to plain JSON values."""
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value
+
+
+def _bound(value, name):
+    """A range bound as a float (None for no bound)."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise QueryError(f'bad value for {name!r}: {value!r}') from None
+
+
+def _count(value, name):
+    """A number of rows to return, as an int capped at LIMIT."""
+    try:
+        value = operator.index(value)
+    except TypeError:
+        raise QueryError(f'bad value for {name!r}: {value!r}') from None
+    if value < 0:
+        raise QueryError(f'{name!r} must not be negative, not {value}')
+    return min(value, LIMIT)
+
+
+def _box(summary):
+    stats = box_stats(summary)
+    return {'q1': stats['q1'], 'median': stats['med'], 'q3': stats['q3'],
+            'lowerfence': stats['whislo'], 'upperfence': stats['whishi']}
+
+
+class QueryService:
+    """In-process answers to the notebook's questions over a cleaned apps frame.
+
+    ``polarity`` is an optional Grouped summary of Sentiment_Polarity by Type,
+    e.g. the ``polarity_by_type`` result of the pipeline's sentiment stage.
+    """
+
+    def __init__(self, apps, polarity=None, stats=None):
+        self.apps = apps.reset_index(drop=True)
+        self.stats = stats if stats is not None else CategoryStats.from_frame(self.apps)
+        self.indexes = {col: SortedIndex(self.apps[col]) for col in INDEXED}
+        n_labels = len(self.stats.labels)
+        self.category_indexes = {
+            col: GroupedSortedIndex(self.apps[col], self.stats.codes, n_labels)
+            for col in INDEXED}
+        # The columns' own arrays, so building a reply does not go through
+        # DataFrame indexing; only the returned rows are turned into objects
+        self._values = {col: self.apps[col].array for col in self.apps.columns}
+        self._label_codes = {}
+        self._category_counts = _jsonable(self.stats.counts().to_dict())
+        self._summary = _jsonable(self.stats.summary().to_dict(orient='index'))
+        self._large = {}
+        self._average_rating = float(self.apps['Rating'].mean())
+        installs = installs_by_type().update(self.apps)
+        self._installs = {name: _box(summary) | {'count': summary.count}
+                          for name, summary in installs.summaries.items()}
+        self._polarity = {} if polarity is None else {
+            name: _box(summary) | {'count': summary.count}
+            for name, summary in polarity.summaries.items()}
+        self._ops = {
+            'apps_per_category': self.apps_per_category,
+            'average_rating': self.average_rating,
+            'range': self.range,
+            'top': self.top,
+            'category_summary': self.category_summary,
+            'large_categories': self.large_categories,
+            'installs_by_type': self.installs_by_type,
+            'polarity_by_type': self.polarity_by_type,
+        }
+
+    @classmethod
+    def from_pipeline(cls, pipeline, with_sentiment=True):
+        """Build from the typecast, category_stats and (optionally) sentiment stages."""
+        polarity = pipeline.get('sentiment')['polarity_by_type'] if with_sentiment else None
+        return cls(pipeline.get('typecast'), polarity=polarity,
+                   stats=pipeline.get('category_stats'))
+
+    def _check_column(self, column):
+        if column not in self.indexes:
+            raise QueryError(f'no index on {column!r}; indexed columns are {INDEXED}')
+
+    def _codes(self, categories):
+        """Label codes of one category name or a list of them."""
+        key = (categories,) if isinstance(categories, str) else tuple(categories)
+        if key not in self._label_codes:
+            unknown = [name for name in key if name not in self._category_counts]
+            if unknown:
+                raise QueryError(f'unknown category {unknown[0]!r}')
+            self._label_codes[key] = self.stats.label_codes(list(key))
+        return self._label_codes[key]
+
+    def _records(self, rows, columns):
+        columns = DEFAULT_COLUMNS if columns is None else list(columns)
+        for col in columns:
+            if col not in self._values:
+                raise QueryError(f'unknown column {col!r}')
+        values = [np.asarray(self._values[col].take(rows), dtype=object) for col in columns]
+        return [{col: _jsonable(value) for col, value in zip(columns, row)}
+                for row in zip(*values)]
+
+    def apps_per_category(self):
+        """Number of apps in each category, largest first (section 4)."""
+        return self._category_counts
+
+    def average_rating(self):
+        """Average app rating (section 5)."""
+        return self._average_rating
+
+    def range(self, column, low=None, high=None, include_low=True,
+              include_high=True, category=None, columns=None, limit=LIMIT):
+        """Apps with ``column`` between ``low`` and ``high``.
+
+        ``category`` (one name or a list) narrows the result the way section
+        8 narrows ``popular_app_cats``. Matches come back sorted by ``column``;
+        ``count`` is the total number of matches and ``apps`` the first
+        ``limit`` of them, at most LIMIT.
+        """
+        self._check_column(column)
+        low, high = _bound(low, 'low'), _bound(high, 'high')
+        limit = _count(limit, 'limit')
+        if category is None:
+            rows = self.indexes[column].range(low, high, include_low, include_high)
+            count, rows = len(rows), rows[:limit]
+        else:
+            count, rows = self.category_indexes[column].range(
+                self._codes(category), low, high, include_low, include_high, limit)
+        return {'count': int(count), 'apps': self._records(rows, columns)}
+
+    def top(self, column, k=10, largest=True, category=None, columns=None):
+        """The ``k`` apps with the largest (or smallest) ``column``; at most LIMIT."""
+        self._check_column(column)
+        k = _count(k, 'k')
+        if category is None:
+            rows = self.indexes[column].top(k, largest)
+        else:
+            rows = self.category_indexes[column].top(self._codes(category), k, largest)
+        return self._records(rows, columns)
+
+    def category_summary(self, category=None):
+        """Count and Rating/Size/Price moments of one or every category."""
+        if category is None:
+            return self._summary
+        if category not in self._summary:
+            raise QueryError(f'unknown category {category!r}')
+        return self._summary[category]
+
+    def large_categories(self, min_count=250):
+        """Categories with at least ``min_count`` apps with Rating and Size (section 6)."""
+        if min_count not in self._large:
+            self._large[min_count] = [str(name) for name in self.stats.large(min_count)]
+        return self._large[min_count]
+
+    def installs_by_type(self):
+        """Box statistics of installs for paid and free apps (section 9)."""
+        return _jsonable(self._installs)
+
+    def polarity_by_type(self):
+        """Box statistics of review polarity for paid and free apps (section 10)."""
+        return _jsonable(self._polarity)
+
+    def handle(self, request):
+        """Answer a request dict ``{'op': name, **arguments}``."""
+        request = dict(request)
+        op = request.pop('op', None)
+        if op not in self._ops:
+            raise QueryError(f'unknown op {op!r}; ops are {sorted(self._ops)}')
+        try:
+            return self._ops[op](**request)
+        except QueryError:
+            raise
+        except (TypeError, ValueError) as e:
+            raise QueryError(f'bad arguments for {op!r}: {e}') from None
+
+
+class LocalClient:
+    """Stand-in for HTTPClient that calls a QueryService in the same process."""
+
+    def __init__(self, service):
+        self.service = service
+
+    def query(self, op, **params):
+        # Round-trip through JSON so answers match what HTTPClient returns
+        return json.loads(json.dumps(self.service.handle({'op': op, **params})))
+
+
+def _parse_bool(text):
+    if text.lower() not in ('true', 'false'):
+        raise ValueError(f'expected true or false, not {text!r}')
+    return text.lower() == 'true'
+
+
+# Arguments that arrive as strings in a query string, and their types
+_PARAM_TYPES = {
+    'low': float, 'high': float, 'k': int, 'limit': int, 'min_count': int,
+    'include_low': _parse_bool, 'include_high': _parse_bool, 'largest': _parse_bool,
+}
+
+# Arguments that may be repeated in a query string
+_LIST_PARAMS = {'category', 'columns'}
+
+
+def _parse_query(query):
+    params = {}
+    for key, value in parse_qsl(query):
+        if key in _LIST_PARAMS:
+            params.setdefault(key, []).append(value)
+            continue
+        try:
+            params[key] = _PARAM_TYPES.get(key, str)(value)
+        except ValueError:
+            raise QueryError(f'bad value for {key!r}: {value!r}') from None
+    # A single category is passed as a plain name
+    if len(params.get('category', [])) == 1:
+        params['category'] = params['category'][0]
+    return params
+
+
+def serve(service, host='127.0.0.1', port=8050):
+    """Serve ``GET /query?op=...`` answers from ``service`` until interrupted."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != '/query':
+                self._reply(404, {'error': 'not found'})
+                return
+            try:
+                self._reply(200, service.handle(_parse_query(url.query)))
+            except QueryError as e:
+                self._reply(400, {'error': str(e)})
+            except Exception as e:
+                # Answer rather than drop the connection on an unexpected error
+                self._reply(500, {'error': f'{type(e).__name__}: {e}'})
+
+        def _reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+class HTTPClient:
+    """Client for a server started with ``serve``."""
+
+    def __init__(self, url='http://127.0.0.1:8050'):
+        self.url = url.rstrip('/')
+
+    def query(self, op, **params):
+        pairs = [('op', op)]
+        for key, value in params.items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            pairs.extend((key, str(item)) for item in values)
+        with urlopen(f'{self.url}/query?{urlencode(pairs)}') as response:
+            return json.loads(response.read())
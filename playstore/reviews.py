@@ -0,0 +1,122 @@
+"""Streaming join of user_reviews.csv onto the apps table.
+
+Section 10 of the notebook reads the whole review file, merges it with
+``apps`` on ``App`` and only then drops reviews without a Sentiment or Review.
+The merged frame repeats every app column for every review, which does not fit
+in memory for a full review corpus.
+
+Here the review file is read in chunks. Each chunk has its NA rows dropped
+first, is joined by probing a hash index built once on ``apps['App']``, and is
+handed to a set of incremental aggregators (see playstore.sketches; the
+section 10 boxplot uses ``polarity_by_type``). Only the app columns that are
+asked for are attached, and no chunk is kept after the aggregators have seen
+it, so peak memory is bounded by the chunk size.
+"""
+
+import numpy as np
+import pandas as pd
+
+from playstore.loading import REVIEWS_CSV, REVIEWS_SCHEMA, read_typed_csv
+
+# Rows of user_reviews.csv read at a time
+CHUNKSIZE = 100_000
+
+# Columns that must be present for a review to be kept (as in the notebook)
+REQUIRED = ['Sentiment', 'Review']
+
+
+class AppIndex:
+    """Hash index from app name to rows of the apps table.
+
+    App names are not unique in the store dump, so a probe can match several
+    rows; like ``merge``, a review is then repeated once per matching app.
+    """
+
+    def __init__(self, apps, columns=None):
+        if columns is None:
+            columns = [col for col in apps.columns if col != 'App']
+        self.columns = list(columns)
+        self.index = pd.Index(apps['App'].to_numpy())
+        self.matches = self.index.value_counts()
+        self.values = apps[self.columns].reset_index(drop=True)
+
+    def probe(self, names):
+        """Return (review positions, app positions) of every match for names."""
+        if self.index.is_unique:
+            app_pos = self.index.get_indexer(names)
+            review_pos = np.flatnonzero(app_pos >= 0)
+            return review_pos, app_pos[review_pos]
+        app_pos, _ = self.index.get_indexer_non_unique(names)
+        # get_indexer_non_unique returns one entry per match, in order of names,
+        # with -1 for names that have no match
+        counts = self.matches.reindex(names, fill_value=0).to_numpy()
+        review_pos = np.repeat(np.arange(len(names)), np.maximum(counts, 1))
+        keep = app_pos >= 0
+        return review_pos[keep], app_pos[keep]
+
+    def join(self, reviews):
+        """Inner-join a chunk of reviews with the indexed app columns."""
+        review_pos, app_pos = self.probe(reviews['App'].to_numpy())
+        left = reviews.iloc[review_pos].reset_index(drop=True)
+        right = self.values.iloc[app_pos].reset_index(drop=True)
+        return pd.concat([left, right], axis=1)
+
+
+def iter_review_chunks(path=REVIEWS_CSV, chunksize=CHUNKSIZE):
+    """Yield typed chunks of user_reviews.csv with NA reviews already dropped."""
+    reader = read_typed_csv(path, REVIEWS_SCHEMA, chunksize=chunksize)
+    for chunk in reader:
+        yield chunk.dropna(subset=REQUIRED)
+
+
+def iter_merged(apps, path=REVIEWS_CSV, columns=None, chunksize=CHUNKSIZE):
+    """Yield the notebook's ``merged_df`` one chunk at a time.
+
+    ``columns`` limits which app columns are attached to each review.
+    """
+    index = AppIndex(apps, columns)
+    for chunk in iter_review_chunks(path, chunksize):
+        yield index.join(chunk)
+
+
+class GroupedMoments:
+    """Count, sum and sum of squares of a value column, kept per group."""
+
+    def __init__(self, group, value):
+        self.group = group
+        self.value = value
+        self.totals = None
+
+    def update(self, chunk):
+        values = chunk[self.value]
+        part = pd.DataFrame({
+            'count': values.notna().astype(np.int64),
+            'sum': values.fillna(0),
+            'sum_sq': values.fillna(0) ** 2,
+        }).groupby(chunk[self.group].to_numpy()).sum()
+        self.totals = part if self.totals is None else self.totals.add(part, fill_value=0)
+
+    def merge(self, other):
+        if other.totals is not None:
+            self.totals = (other.totals if self.totals is None
+                           else self.totals.add(other.totals, fill_value=0))
+        return self
+
+    def result(self):
+        totals = self.totals
+        mean = totals['sum'] / totals['count']
+        var = totals['sum_sq'] / totals['count'] - mean ** 2
+        return pd.DataFrame({'count': totals['count'], 'mean': mean,
+                             'std': np.sqrt(var.clip(lower=0))})
+
+
+def stream_reviews(apps, aggregators, path=REVIEWS_CSV, chunksize=CHUNKSIZE):
+    """Feed every merged review chunk to ``aggregators`` and return them.
+
+    Only the app columns the aggregators group on are attached to reviews.
+    """
+    columns = sorted({agg.group for agg in aggregators} - set(REVIEWS_SCHEMA))
+    for chunk in iter_merged(apps, path, columns=columns, chunksize=chunksize):
+        for agg in aggregators:
+            agg.update(chunk)
+    return aggregators
@@ -0,0 +1,266 @@
+"""Re-scoring of review text and per-app / per-category sentiment rollups.
+
+Section 10 uses the Sentiment, Sentiment_Polarity and Sentiment_Subjectivity
+columns that came precomputed with user_reviews.csv. New scrapes only have
+the raw Review text, so reviews are scored here with a small lexicon-based
+scorer in the spirit of the one those columns were made with:
+
+* polarity is the mean score of the opinion words in a review, where a
+  preceding 'not' flips a word and 'very'-style intensifiers scale it,
+* subjectivity is the share of words that carry an opinion,
+* Sentiment is Positive, Negative or Neutral by the sign of the polarity.
+
+Scoring is pure Python per review, so distinct texts are split into batches
+and scored in a process pool. Scores are cached by a 64-bit hash of the text
+in a ``ScoreCache`` file tied to the lexicon, so unchanged reviews are never
+scored twice, across runs as well as within one. Per-app totals use the same
+``ReviewAggregates`` as the incremental pipeline and can be joined to apps.
+"""
+
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from playstore.incremental import ReviewAggregates
+
+# Opinion words and their polarity in [-1, 1]
+LEXICON = {
+    'amazing': 0.6, 'awesome': 1.0, 'best': 1.0, 'better': 0.5, 'easy': 0.43,
+    'excellent': 1.0, 'fantastic': 0.4, 'fast': 0.2, 'fine': 0.42, 'fun': 0.3,
+    'good': 0.7, 'great': 0.8, 'happy': 0.8, 'helpful': 0.5, 'like': 0.3,
+    'love': 0.5, 'nice': 0.6, 'perfect': 1.0, 'simple': 0.2, 'thanks': 0.2,
+    'useful': 0.3, 'wonderful': 1.0, 'worth': 0.3,
+    'annoying': -0.8, 'awful': -1.0, 'bad': -0.7, 'boring': -1.0,
+    'broken': -0.4, 'crash': -0.5, 'crashes': -0.5, 'difficult': -0.5,
+    'disappointed': -0.75, 'error': -0.4, 'fake': -0.5, 'hate': -0.8,
+    'horrible': -1.0, 'poor': -0.4, 'problem': -0.3, 'refund': -0.4,
+    'scam': -0.8, 'slow': -0.3, 'stupid': -0.8, 'terrible': -1.0,
+    'useless': -0.5, 'waste': -0.2, 'worse': -0.4, 'worst': -1.0,
+    'wrong': -0.5,
+}
+
+# Words that flip the polarity of the next opinion word
+NEGATIONS = {'not', 'no', 'never', "don't", "doesn't", "didn't", "isn't", "can't"}
+
+# Words that scale the polarity of the next opinion word
+INTENSIFIERS = {'very': 1.3, 'really': 1.3, 'so': 1.2, 'extremely': 1.5,
+                'too': 1.2, 'super': 1.4}
+
+_TOKEN = re.compile(r"[a-z']+")
+
+# Version of the scoring rules in score_text; bump it whenever they change,
+# so that scores cached under the old rules are not reused
+SCORER_VERSION = 1
+
+# Distinct texts scored per task sent to the process pool
+BATCH_SIZE = 5_000
+
+
+def score_text(text, lexicon=LEXICON):
+    """Return (polarity, subjectivity) of one review."""
+    tokens = _TOKEN.findall(text.lower())
+    if not tokens:
+        return 0.0, 0.0
+    scores = []
+    sign, scale = 1.0, 1.0
+    for token in tokens:
+        if token in NEGATIONS:
+            sign = -1.0
+        elif token in INTENSIFIERS:
+            scale *= INTENSIFIERS[token]
+        elif token in lexicon:
+            scores.append(max(-1.0, min(1.0, lexicon[token] * sign * scale)))
+            sign, scale = 1.0, 1.0
+    if not scores:
+        return 0.0, 0.0
+    return sum(scores) / len(scores), min(1.0, len(scores) / len(tokens) * 2)
+
+
+def score_batch(texts, lexicon=LEXICON):
+    """Score a list of texts; returns (polarity, subjectivity) float64 arrays."""
+    scores = np.array([score_text(text, lexicon) for text in texts],
+                      dtype=np.float64).reshape(-1, 2)
+    return scores[:, 0], scores[:, 1]
+
+
+def sentiment_labels(polarity):
+    """Positive / Negative / Neutral by the sign of ``polarity``."""
+    return np.where(polarity > 0, 'Positive',
+                    np.where(polarity < 0, 'Negative', 'Neutral')).astype(object)
+
+
+def lexicon_digest(lexicon=LEXICON):
+    """Short digest of a lexicon and the scoring rules, used to name caches."""
+    text = repr((SCORER_VERSION, sorted(lexicon.items()), sorted(NEGATIONS),
+                 sorted(INTENSIFIERS.items())))
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+def text_hashes(texts):
+    """uint64 hash of every text."""
+    return pd.util.hash_array(np.asarray(texts, dtype=object))
+
+
+def _merge_runs(runs):
+    """Merge sorted (hashes, polarity, subjectivity) runs into one, first score kept.
+
+    A stable sort of the concatenated runs finds and merges the sorted runs
+    already in it, so this is close to a linear merge.
+    """
+    hashes = np.concatenate([run[0] for run in runs])
+    order = np.argsort(hashes, kind='stable')
+    hashes = hashes[order]
+    first = np.concatenate([[True], hashes[1:] != hashes[:-1]])[:len(hashes)]
+    order = order[first]
+    return (hashes[first], np.concatenate([run[1] for run in runs])[order],
+            np.concatenate([run[2] for run in runs])[order])
+
+
+class ScoreCache:
+    """Scores of already seen texts, keyed by text hash and kept sorted on disk.
+
+    The file lives in ``directory`` and is named after the lexicon digest, so
+    a different lexicon starts from an empty cache. Scores added since the
+    last ``save`` are kept as separate sorted runs (merged among themselves
+    once there are more than ``max_runs``), so adding a chunk's scores does
+    not re-sort the whole cache; ``save`` merges them into it.
+    """
+
+    def __init__(self, directory, lexicon=LEXICON, max_runs=8):
+        self.path = os.path.join(directory, f'scores-{lexicon_digest(lexicon)}.npz')
+        self.max_runs = max_runs
+        self.pending = []
+        if os.path.exists(self.path):
+            with np.load(self.path) as data:
+                self.hashes = data['hashes']
+                self.polarity = data['polarity']
+                self.subjectivity = data['subjectivity']
+        else:
+            self.hashes = np.empty(0, dtype=np.uint64)
+            self.polarity = np.empty(0)
+            self.subjectivity = np.empty(0)
+
+    def __len__(self):
+        return len(self.hashes) + sum(len(run[0]) for run in self.pending)
+
+    def lookup(self, hashes):
+        """Return (found mask, polarity, subjectivity) for ``hashes``."""
+        found = np.zeros(len(hashes), dtype=bool)
+        polarity = np.full(len(hashes), np.nan)
+        subjectivity = np.full(len(hashes), np.nan)
+        for run_hashes, run_polarity, run_subjectivity in [
+                (self.hashes, self.polarity, self.subjectivity)] + self.pending:
+            if len(run_hashes) == 0:
+                continue
+            pos = np.minimum(np.searchsorted(run_hashes, hashes), len(run_hashes) - 1)
+            hit = (run_hashes[pos] == hashes) & ~found
+            polarity[hit] = run_polarity[pos[hit]]
+            subjectivity[hit] = run_subjectivity[pos[hit]]
+            found |= hit
+        return found, polarity, subjectivity
+
+    def add(self, hashes, polarity, subjectivity):
+        """Add scores (in memory until ``save``); a hash already present keeps its score."""
+        order = np.argsort(hashes, kind='stable')
+        self.pending.append((np.asarray(hashes, dtype=np.uint64)[order],
+                             np.asarray(polarity, dtype=np.float64)[order],
+                             np.asarray(subjectivity, dtype=np.float64)[order]))
+        if len(self.pending) > self.max_runs:
+            self.pending = [_merge_runs(self.pending)]
+        return self
+
+    def save(self):
+        if self.pending:
+            self.hashes, self.polarity, self.subjectivity = _merge_runs(
+                [(self.hashes, self.polarity, self.subjectivity)] + self.pending)
+            self.pending = []
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + '.tmp.npz'
+        np.savez(tmp, hashes=self.hashes, polarity=self.polarity,
+                 subjectivity=self.subjectivity)
+        os.replace(tmp, self.path)
+
+
+def _score_distinct(texts, pool, lexicon, batch_size):
+    """Score ``texts`` in batches, in ``pool`` if given."""
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    if not batches:
+        return np.empty(0), np.empty(0)
+    score = partial(score_batch, lexicon=lexicon)
+    results = list(pool.map(score, batches) if pool is not None else map(score, batches))
+    return (np.concatenate([polarity for polarity, _ in results]),
+            np.concatenate([subjectivity for _, subjectivity in results]))
+
+
+def score_reviews(reviews_df, pool=None, cache=None, lexicon=LEXICON,
+                  batch_size=BATCH_SIZE):
+    """Return ``reviews_df`` with freshly scored sentiment columns.
+
+    Rows without Review text are dropped. Each distinct text not in ``cache``
+    is scored once, in ``pool`` (a ProcessPoolExecutor) if given; new scores
+    are added to ``cache`` but not saved.
+    """
+    reviews_df = reviews_df.dropna(subset=['Review'])
+    hashes = text_hashes(reviews_df['Review'].to_numpy())
+    distinct, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    if cache is not None:
+        found, polarity, subjectivity = cache.lookup(distinct)
+    else:
+        found = np.zeros(len(distinct), dtype=bool)
+        polarity, subjectivity = np.full(len(distinct), np.nan), np.full(len(distinct), np.nan)
+
+    missing = np.flatnonzero(~found)
+    texts = reviews_df['Review'].to_numpy()[first[missing]].tolist()
+    new_polarity, new_subjectivity = _score_distinct(texts, pool, lexicon, batch_size)
+    polarity[missing] = new_polarity
+    subjectivity[missing] = new_subjectivity
+    if cache is not None:
+        cache.add(distinct[missing], new_polarity, new_subjectivity)
+
+    scored = reviews_df.copy()
+    scored['Sentiment_Polarity'] = polarity[inverse]
+    scored['Sentiment_Subjectivity'] = subjectivity[inverse]
+    scored['Sentiment'] = sentiment_labels(scored['Sentiment_Polarity'].to_numpy())
+    return scored
+
+
+def app_sentiment(scored):
+    """Per-app review counts, polarity/subjectivity totals and means, by label."""
+    return ReviewAggregates().apply(scored.assign(n=1)).per_app()
+
+
+def category_sentiment(per_app, apps, key='Category'):
+    """Roll per-app totals up to ``key`` (an apps column) and recompute means."""
+    keys = apps.drop_duplicates(subset='App').set_index('App')[key]
+    joined = per_app.join(keys, how='inner')
+    totals = joined.drop(columns=['polarity_mean', 'subjectivity_mean']).groupby(
+        key, observed=True).sum()
+    totals['polarity_mean'] = totals['polarity_sum'] / totals['reviews']
+    totals['subjectivity_mean'] = totals['subjectivity_sum'] / totals['reviews']
+    return totals
+
+
+def score_file(path, cache_dir=None, processes=None, chunksize=200_000,
+               lexicon=LEXICON, batch_size=BATCH_SIZE):
+    """Score a reviews CSV (App and Review columns) chunk by chunk.
+
+    Returns per-app aggregates as ``app_sentiment`` does. One process pool is
+    kept for the whole file; with ``cache_dir`` the score cache is loaded
+    before and saved after.
+    """
+    cache = None if cache_dir is None else ScoreCache(cache_dir, lexicon)
+    aggregates = ReviewAggregates()
+    reader = pd.read_csv(path, usecols=['App', 'Review'], dtype=str, chunksize=chunksize)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for chunk in reader:
+            scored = score_reviews(chunk, pool=pool, cache=cache, lexicon=lexicon,
+                                   batch_size=batch_size)
+            aggregates.apply(scored.assign(n=1))
+    if cache is not None:
+        cache.save()
+    return aggregates.per_app()
@@ -0,0 +1,270 @@
+"""Mergeable distribution summaries for the rating, install and polarity plots.
+
+The notebook hands whole columns to plotly and seaborn, which serialize every
+point into the figure. The summaries here are built in one pass over the data
+(or over chunks of it), have a size that does not grow with the number of
+rows, and merge by simple addition, so partial summaries from chunks or
+partitions can be combined:
+
+* ``Histogram`` counts values on a fixed grid of bins.
+* ``QuantileSketch`` is a KLL-style compactor sketch for quantiles of columns
+  with no natural range, such as Installs.
+* ``Grouped`` keeps one summary per value of a grouping column.
+
+playstore.plots turns these into plotly and matplotlib figures.
+"""
+
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+# Quantiles that make up a box plot
+BOX_QUANTILES = [0.25, 0.5, 0.75]
+
+
+class Histogram:
+    """Counts of a value column on fixed bin edges.
+
+    Values outside the edges are counted in the first or last bin, so no row
+    is lost; NaN values are skipped. The smallest and largest values seen are
+    kept exactly.
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @classmethod
+    def linear(cls, start, stop, bins):
+        return cls(np.linspace(start, stop, bins + 1))
+
+    @classmethod
+    def log(cls, start, stop, bins):
+        """Bins evenly spaced in log10 between ``start`` and ``stop`` (> 0)."""
+        return cls(np.logspace(np.log10(start), np.log10(stop), bins + 1))
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        pos = np.searchsorted(self.edges, values, side='right') - 1
+        pos = np.clip(pos, 0, len(self.counts) - 1)
+        self.counts += np.bincount(pos, minlength=len(self.counts))
+        return self
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError('cannot merge histograms with different bin edges')
+        self.counts += other.counts
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantiles(self, q):
+        """Quantiles interpolated linearly inside the bin holding each rank."""
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        cum = np.cumsum(self.counts)
+        if len(cum) == 0 or cum[-1] == 0:
+            return np.full(len(q), np.nan)
+        rank = np.maximum(q * cum[-1], np.finfo(np.float64).tiny)
+        pos = np.minimum(np.searchsorted(cum, rank, side='left'), len(cum) - 1)
+        before = np.where(pos > 0, cum[pos - 1], 0)
+        frac = (rank - before) / np.maximum(self.counts[pos], 1)
+        lo, hi = self.edges[pos], self.edges[pos + 1]
+        return lo + np.clip(frac, 0, 1) * (hi - lo)
+
+    def points(self):
+        """Sorted representative values: the middle of every non-empty bin.
+
+        The first and last are replaced by the exact minimum and maximum.
+        """
+        nonempty = np.flatnonzero(self.counts)
+        points = (self.edges[nonempty] + self.edges[nonempty + 1]) / 2
+        if len(points):
+            points = np.clip(points, self.min, self.max)
+            points[0], points[-1] = self.min, self.max
+        return points
+
+
+class QuantileSketch:
+    """KLL-style quantile sketch with exact count, sum, min and max.
+
+    Items live in levels of sorted arrays; an item on level ``h`` stands for
+    ``2**h`` input values. When a level holds more than ``k`` items it is
+    sorted and every other item (from a random offset) is promoted to the next
+    level. The rank error is roughly ``log2(n / k) / k`` of n, independent of
+    the value range.
+    """
+
+    def __init__(self, k=2048, seed=None):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.sum = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                items = np.sort(items)
+                # An odd item out stays behind so the level weight is preserved
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                promoted = pairs[self._rng.integers(2)::2]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                self.levels[h] = keep
+            h += 1
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** h)
+                                  for h, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, q):
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if self.count == 0:
+            return np.full(len(q), np.nan)
+        items, cum = self._weighted()
+        pos = np.searchsorted(cum, q * cum[-1], side='left')
+        result = items[np.minimum(pos, len(items) - 1)]
+        # The extremes are tracked exactly
+        result = np.where(q <= 0, self.min, result)
+        return np.where(q >= 1, self.max, result)
+
+    def points(self):
+        """Sorted distinct values retained by the sketch, including min and max."""
+        if self.count == 0:
+            return np.empty(0)
+        return np.unique(np.concatenate(self.levels + [[self.min, self.max]]))
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else np.nan
+
+
+class Grouped:
+    """One summary per value of a grouping column.
+
+    ``factory`` builds an empty summary (a Histogram or QuantileSketch) for
+    each new group.
+    """
+
+    def __init__(self, group, value, factory):
+        self.group = group
+        self.value = value
+        self.factory = factory
+        self.summaries = {}
+
+    def update(self, chunk):
+        values = chunk[self.value].to_numpy(dtype=np.float64, na_value=np.nan)
+        codes, groups = pd.factorize(chunk[self.group])
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(groups) + 1))
+        for code, name in enumerate(groups):
+            rows = order[bounds[code]:bounds[code + 1]]
+            if name not in self.summaries:
+                self.summaries[name] = self.factory()
+            self.summaries[name].update(values[rows])
+        return self
+
+    def merge(self, other):
+        for name, summary in other.summaries.items():
+            if name in self.summaries:
+                self.summaries[name].merge(summary)
+            else:
+                self.summaries[name] = summary
+        return self
+
+    def quantiles(self, q):
+        """Return a DataFrame of quantiles ``q`` (index) for each group."""
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        return pd.DataFrame({name: summary.quantiles(q)
+                             for name, summary in self.summaries.items()},
+                            index=pd.Index(q, name='quantile'))
+
+    def result(self):
+        return self.quantiles([0.0] + BOX_QUANTILES + [1.0])
+
+
+def box_stats(summary, whis=1.5):
+    """Box plot statistics of a summary, in the form matplotlib's bxp expects.
+
+    Whiskers follow Tukey's rule: they end at the most extreme value the
+    summary retains inside ``whis`` IQRs of the box, and the retained values
+    beyond that are the ``fliers``. For a Histogram these are bin midpoints
+    plus the exact minimum and maximum; for a QuantileSketch they are items
+    of the sketch, so rare outliers may be thinned out but the extremes are
+    always present.
+    """
+    q1, med, q3 = summary.quantiles(BOX_QUANTILES)
+    iqr = q3 - q1
+    low, high = q1 - whis * iqr, q3 + whis * iqr
+    points = summary.points()
+    inside = points[(points >= low) & (points <= high)]
+    return {
+        'q1': q1, 'med': med, 'q3': q3,
+        'whislo': inside[0] if len(inside) else q1,
+        'whishi': inside[-1] if len(inside) else q3,
+        'fliers': points[(points < low) | (points > high)],
+    }
+
+
+def rating_histogram(bins=40):
+    """Histogram used for the section 5 rating distribution (ratings are 1-5)."""
+    return Histogram.linear(1.0, 5.0, bins)
+
+
+def installs_by_type():
+    """Sketch behind the section 9 paid vs. free installs box plot."""
+    # A fixed seed keeps the sketch, and so the memoized stage results,
+    # reproducible from run to run
+    return Grouped('Type', 'Installs', partial(QuantileSketch, seed=0))
+
+
+def polarity_by_type(bins=2000):
+    """Histogram behind the section 10 polarity box plot (polarity is -1 to 1)."""
+    return Grouped('Type', 'Sentiment_Polarity',
+                   partial(Histogram.linear, -1.0, 1.0, bins))
@@ -0,0 +1,33 @@
+"""Shared fixtures: apps.csv as the notebook and as playstore load it."""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from playstore.cleaning import clean_apps  # noqa: E402
+from playstore.loading import load_apps  # noqa: E402
+
+APPS_CSV = os.path.join(ROOT, 'apps.csv')
+
+
+@pytest.fixture(scope='session')
+def raw_apps():
+    """apps.csv read with the playstore schema, positional index column included."""
+    return load_apps(APPS_CSV, use_cache=False)
+
+
+@pytest.fixture(scope='session')
+def apps(raw_apps):
+    """Cleaned apps, as the notebook has them after section 3."""
+    return clean_apps(raw_apps).reset_index(drop=True)
+
+
+@pytest.fixture
+def genre_lists(apps):
+    """Distinct genres of every app, from splitting Genres on ';'."""
+    return apps['Genres'].astype(str).str.split(';').map(lambda parts: set(parts))
+
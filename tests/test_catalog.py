@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from playstore.catalog import AppCatalog, parse_api_range
+
+
+def test_genre_rows_match_split_membership(raw_apps, apps, genre_lists):
+    catalog = AppCatalog.from_frame(raw_apps)
+    for genre in ['Education', 'Action', 'Pretend Play', 'Tools']:
+        expected = np.flatnonzero(genre_lists.map(lambda parts: genre in parts).to_numpy())
+        np.testing.assert_array_equal(catalog.genre_rows(genre), expected)
+
+
+def test_every_genre_row_is_listed_once(raw_apps):
+    genres = AppCatalog.from_frame(raw_apps).genres
+    for label in genres.labels:
+        rows = genres.get(label)
+        assert len(rows) == len(np.unique(rows))
+
+
+def test_select_matches_masks(raw_apps, apps, genre_lists):
+    catalog = AppCatalog.from_frame(raw_apps)
+    mask = (apps['Category'] == 'FAMILY') & genre_lists.map(lambda parts: 'Education' in parts)
+    selected = catalog.select(category='FAMILY', genre='Education')
+    assert len(selected) == mask.sum()
+    assert list(selected['App']) == list(apps.loc[mask, 'App'])
+
+
+def test_category_rows_match_mask(raw_apps, apps):
+    catalog = AppCatalog.from_frame(raw_apps)
+    expected = np.flatnonzero((apps['Category'] == 'GAME').to_numpy())
+    np.testing.assert_array_equal(catalog.category_rows('GAME'), expected)
+    assert len(catalog.category_rows('NO_SUCH_CATEGORY')) == 0
+
+
+def test_numeric_columns_keep_values(raw_apps, apps):
+    frame = AppCatalog.from_frame(raw_apps).frame
+    np.testing.assert_array_equal(frame['Installs'].to_numpy(), apps['Installs'].to_numpy())
+    np.testing.assert_array_equal(frame['Price'].to_numpy(), apps['Price'].to_numpy())
+    np.testing.assert_allclose(frame['Rating'].to_numpy(), apps['Rating'].to_numpy(),
+                               rtol=1e-6)
+
+
+def test_large_installs_do_not_wrap(raw_apps):
+    big = raw_apps.head(3).copy()
+    big['Installs'] = ['5,000,000,000+', '10,000,000,000+', '100+']
+    installs = AppCatalog.from_frame(big).frame['Installs']
+    assert list(installs) == [5_000_000_000, 10_000_000_000, 100]
+
+
+def test_parse_api_range():
+    low, high = parse_api_range(pd.Series(['4.0.3 and up', '4.1 - 7.1.1',
+                                           'Varies with device', None]))
+    assert list(low) == [15, 16, 0, 0]
+    assert list(high) == [0, 25, 0, 0]
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from playstore.categories import CategoryStats, genre_stats
+
+
+def test_counts_match_value_counts(apps):
+    stats = CategoryStats.from_frame(apps)
+    expected = apps['Category'].astype(str).value_counts()
+    counts = stats.counts()
+    counts.index = counts.index.astype(str)
+    pd.testing.assert_series_equal(counts.sort_index(), expected.sort_index(),
+                                   check_names=False)
+
+
+def test_summary_matches_groupby(apps):
+    summary = CategoryStats.from_frame(apps).summary()
+    summary.index = summary.index.astype(str)
+    grouped = apps.groupby(apps['Category'].astype(str))
+    for col in ['Rating', 'Size', 'Price']:
+        np.testing.assert_allclose(summary[f'{col}_mean'].sort_index(),
+                                   grouped[col].mean().sort_index())
+        np.testing.assert_allclose(summary[f'{col}_std'].sort_index(),
+                                   grouped[col].std(ddof=0).sort_index(), atol=1e-9)
+
+
+def test_large_matches_groupby_filter(apps):
+    present = apps.dropna(subset=['Rating', 'Size'])
+    expected = present.groupby(present['Category'].astype(str)).filter(lambda x: len(x) >= 250)
+    large = CategoryStats.from_frame(apps).large(250)
+    assert set(map(str, large)) == set(expected['Category'].astype(str))
+
+
+def test_mask_matches_isin(apps):
+    stats = CategoryStats.from_frame(apps)
+    members = ['GAME', 'FAMILY', 'MEDICAL']
+    np.testing.assert_array_equal(stats.mask(members), apps['Category'].isin(members))
+
+
+def test_partitions_merge_to_whole(apps):
+    whole = CategoryStats.from_frame(apps)
+    parts = [apps.iloc[i:i + 2500] for i in range(0, len(apps), 2500)]
+    merged = CategoryStats.merge_all([CategoryStats.from_frame(part) for part in parts])
+    pd.testing.assert_series_equal(merged.counts().sort_index(), whole.counts().sort_index(),
+                                   check_index_type=False, check_categorical=False)
+    np.testing.assert_array_equal(merged.mask(['GAME']), whole.mask(['GAME']))
+
+
+def test_genre_counts_each_app_once(apps, genre_lists):
+    expected = genre_lists.explode().value_counts()
+    counts = genre_stats(apps).counts()
+    assert counts['Education'] == expected['Education']
+    pd.testing.assert_series_equal(counts.sort_index(), expected.sort_index(),
+                                   check_names=False, check_index_type=False)
+
+
+def test_genre_summary_matches_explode(apps, genre_lists):
+    exploded = apps.assign(genre=genre_lists.map(sorted)).explode('genre')
+    expected = exploded.groupby('genre')['Rating'].mean()
+    summary = genre_stats(apps).summary()
+    np.testing.assert_allclose(summary['Rating_mean'].reindex(expected.index), expected)
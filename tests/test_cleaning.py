@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from playstore.cleaning import (clean_apps, clean_apps_loop, parse_last_updated,
+                                parse_number, parse_reviews, parse_size)
+
+
+def test_installs_and_price_match_notebook_loop(raw_apps):
+    cols = ['Installs', 'Price']
+    expected = clean_apps_loop(raw_apps, cols_to_clean=cols)
+    cleaned = clean_apps(raw_apps, columns=cols)
+    pd.testing.assert_frame_equal(cleaned[cols], expected[cols])
+
+
+def test_parse_number_formats():
+    raw = pd.Series(['10,000+', '$4.99', '0', ' 5 ', '1,000,000+', None])
+    np.testing.assert_array_equal(parse_number(raw),
+                                  [10000.0, 4.99, 0.0, 5.0, 1e6, np.nan])
+
+
+def test_parse_number_does_not_drop_bytes():
+    raw = pd.Series(['-1', '1e3', '1.2.3', '12abc', 'Free', ''])
+    np.testing.assert_array_equal(parse_number(raw),
+                                  [-1.0, 1000.0, np.nan, np.nan, np.nan, np.nan])
+
+
+def test_parse_number_matches_to_numeric():
+    raw = pd.Series(['+7', '$-2.5', '3.', '.5', '1,2', '4 5', '--1', '0x10'])
+    stripped = raw.str.replace(r'[+,$\s]', '', regex=True)
+    expected = pd.to_numeric(stripped, errors='coerce').astype(np.float64)
+    pd.testing.assert_series_equal(parse_number(raw), expected)
+
+
+def test_non_ascii_takes_same_path():
+    raw = pd.Series(['10,000+', '$4.99', '-1', 'gratuit é'])
+    ascii_only = parse_number(raw.iloc[:3])
+    np.testing.assert_array_equal(parse_number(raw).iloc[:3], ascii_only)
+    assert np.isnan(parse_number(raw).iloc[3])
+
+
+def test_parse_size_units():
+    raw = pd.Series(['19M', '8.7k', '1.5G', 'Varies with device', '-3M', '2x', '7'])
+    expected = [19.0, 8.7 / 1024, 1536.0, np.nan, np.nan, np.nan, 7.0]
+    np.testing.assert_allclose(parse_size(raw), expected)
+    np.testing.assert_allclose(parse_size(pd.concat([raw, pd.Series(['é'])])),
+                               expected + [np.nan])
+
+
+def test_numeric_columns_pass_through(raw_apps):
+    pd.testing.assert_series_equal(parse_reviews(raw_apps['Reviews']), raw_apps['Reviews'])
+    pd.testing.assert_series_equal(parse_size(raw_apps['Size']), raw_apps['Size'])
+
+
+def test_last_updated_matches_to_datetime(raw_apps):
+    expected = pd.to_datetime(raw_apps['Last Updated'], format='%B %d, %Y')
+    pd.testing.assert_series_equal(parse_last_updated(raw_apps['Last Updated']), expected)
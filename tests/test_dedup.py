@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from playstore.dedup import NEAR_DUPLICATE_KEY, FingerprintIndex, deduplicate, duplicated
+from playstore.hashing import column_fingerprints
+
+
+@pytest.fixture
+def with_duplicates(raw_apps):
+    """apps.csv without its index column, with 500 rows repeated and shuffled in."""
+    apps = raw_apps.drop(columns='Unnamed: 0')
+    repeats = apps.sample(500, random_state=0)
+    return pd.concat([apps, repeats]).sample(frac=1, random_state=1).reset_index(drop=True)
+
+
+def test_deduplicate_matches_drop_duplicates(with_duplicates):
+    expected = with_duplicates.drop_duplicates()
+    result = deduplicate(with_duplicates, normalize=False)
+    assert result.index.equals(expected.index)
+
+
+def test_key_matches_subset(with_duplicates):
+    key = list(NEAR_DUPLICATE_KEY)
+    expected = with_duplicates.duplicated(subset=key)
+    np.testing.assert_array_equal(duplicated(with_duplicates, key, normalize=False), expected)
+
+
+def test_normalize_ignores_whitespace_and_case(with_duplicates):
+    frame = with_duplicates.head(100)
+    padded = frame.copy()
+    padded['App'] = '  ' + padded['App'].str.upper() + ' '
+    both = pd.concat([frame, padded], ignore_index=True)
+    assert duplicated(both, normalize=True, casefold=True)[100:].all()
+    assert not duplicated(both, normalize=False)[100:].any()
+
+
+def test_fingerprints_do_not_depend_on_dtype(raw_apps):
+    for col in ['App', 'Genres', 'Category', 'Rating']:
+        values = raw_apps[col]
+        expected = column_fingerprints(values)
+        np.testing.assert_array_equal(column_fingerprints(values.astype('category')), expected)
+        if values.dtype != np.float64:
+            np.testing.assert_array_equal(column_fingerprints(values.astype(object)), expected)
+        # The distinct-value and per-value paths give the same hashes
+        np.testing.assert_array_equal(column_fingerprints(values.iloc[:20]), expected[:20])
+
+
+def test_missing_values_hash_alike():
+    values = pd.Series(['a', None, 'b', np.nan], dtype=object)
+    hashes = column_fingerprints(values)
+    assert hashes[1] == hashes[3]
+    assert len(set(hashes)) == 3
+
+
+def thue_morse(n_bytes):
+    """The first n_bytes of the Thue-Morse sequence over 'a'/'b', and its complement."""
+    bits = np.array([bin(i).count('1') % 2 for i in range(n_bytes)])
+    return ''.join('ab'[b] for b in bits), ''.join('ba'[b] for b in bits)
+
+
+@pytest.mark.parametrize('n_bytes', [1024, 2048, 4096])
+def test_thue_morse_strings_do_not_collide(n_bytes):
+    # These pairs collide under any polynomial hash mod 2**64
+    a, b = thue_morse(n_bytes)
+    frame = pd.DataFrame({'App': [a, b], 'Category': ['X', 'X']})
+    assert len(deduplicate(frame, normalize=False)) == 2
+    # Also through the factorized path, with the pair among repeated values
+    repeated = pd.DataFrame({'App': [a, b] * 50 + ['c'] * 100})
+    assert len(deduplicate(repeated)) == 3
+
+
+def test_index_deduplicates_across_batches(tmp_path, with_duplicates):
+    expected = with_duplicates.drop_duplicates()
+    kept = []
+    for start in range(0, len(with_duplicates), 1000):
+        index = FingerprintIndex(str(tmp_path), max_runs=4)
+        kept.append(index.deduplicate(with_duplicates.iloc[start:start + 1000]))
+        index.save()
+    assert pd.concat(kept).index.equals(expected.index)
+    reopened = FingerprintIndex(str(tmp_path), max_runs=4)
+    assert len(reopened) == len(expected)
+    assert len(reopened.runs) <= 4
+
+
+def test_index_refuses_other_settings(tmp_path, with_duplicates):
+    index = FingerprintIndex(str(tmp_path))
+    index.deduplicate(with_duplicates.head(10))
+    index.save()
+    with pytest.raises(ValueError):
+        FingerprintIndex(str(tmp_path), key=NEAR_DUPLICATE_KEY)
+    with pytest.raises(ValueError):
+        FingerprintIndex(str(tmp_path), normalize=False)
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from playstore.cleaning import clean_apps
+from playstore.incremental import SnapshotState
+
+
+def expected_counts(raw):
+    return clean_apps(raw)['Category'].astype(str).value_counts()
+
+
+def assert_matches_rebuild(state, raw):
+    cleaned = clean_apps(raw)
+    counts = state.apps.category_counts()
+    pd.testing.assert_series_equal(counts.sort_index(), expected_counts(raw).sort_index(),
+                                   check_names=False)
+    rating = cleaned.groupby(cleaned['Category'].astype(str))['Rating'].mean()
+    np.testing.assert_allclose(state.apps.category_rating().reindex(rating.index), rating)
+    assert state.apps.average_rating() == pytest.approx(cleaned['Rating'].mean())
+
+
+def test_first_snapshot_inserts_every_row(tmp_path, raw_apps):
+    state = SnapshotState(str(tmp_path))
+    delta = state.update_apps(raw_apps)
+    assert len(delta.inserted) == len(raw_apps)
+    assert len(delta.deleted) == 0
+    assert_matches_rebuild(state, raw_apps)
+
+
+def test_deleting_a_category_removes_it(tmp_path, raw_apps):
+    state = SnapshotState(str(tmp_path))
+    state.update_apps(raw_apps)
+    without = raw_apps[raw_apps['Category'] != 'BEAUTY']
+    delta = state.update_apps(without)
+    assert len(delta.inserted) == 0
+    assert len(delta.deleted) == (raw_apps['Category'] == 'BEAUTY').sum()
+    assert 'BEAUTY' not in state.apps.category_counts().index
+    assert_matches_rebuild(state, without)
+
+
+def test_delta_is_the_change_only(tmp_path, raw_apps):
+    state = SnapshotState(str(tmp_path))
+    state.update_apps(raw_apps)
+    changed = raw_apps.drop(index=raw_apps.index[5]).copy()
+    changed.loc[changed.index[100], 'Rating'] = 1.0
+    delta = state.update_apps(changed)
+    assert len(delta.inserted) == 1
+    assert len(delta.deleted) == 2
+    assert list(delta.updated) == [changed.loc[changed.index[100], 'App']]
+    assert_matches_rebuild(state, changed)
+
+
+def test_state_round_trips_with_dtypes(tmp_path, raw_apps):
+    state = SnapshotState(str(tmp_path))
+    state.update_apps(raw_apps)
+    state.update_apps(raw_apps.iloc[:-10])
+    state.save()
+    loaded = SnapshotState.load(str(tmp_path))
+    for col in ['Rating', 'Installs', 'Price']:
+        assert loaded.app_rows[col].dtype == np.float64
+    assert loaded.apps.by_category['rating_sum'].dtype == np.float64
+    for col in ['count', 'rating_count']:
+        assert loaded.apps.by_category[col].dtype == np.int64
+    assert loaded.apps.installs_by_type.dtype == np.int64
+    loaded.update_apps(raw_apps)
+    assert_matches_rebuild(loaded, raw_apps)
+
+
+def test_reviews_follow_multiplicity(tmp_path):
+    reviews = pd.DataFrame({
+        'App': ['a', 'a', 'a', 'b', 'b', 'c'],
+        'Review': ['good', 'good', 'bad', 'ok', None, 'fine'],
+        'Sentiment': ['Positive', 'Positive', 'Negative', 'Neutral', None, 'Positive'],
+        'Sentiment_Polarity': [0.7, 0.7, -0.7, 0.0, None, 0.4],
+        'Sentiment_Subjectivity': [0.6, 0.6, 0.6, 0.0, None, 0.5],
+    })
+    state = SnapshotState(str(tmp_path))
+    state.update_reviews(reviews)
+    state.update_reviews(reviews.drop(index=[1, 5]))
+    per_app = state.reviews.per_app()
+    expected = reviews.drop(index=[1, 5]).dropna(subset=['Sentiment', 'Review'])
+    grouped = expected.groupby('App')
+    assert list(per_app.index) == ['a', 'b']
+    np.testing.assert_array_equal(per_app['reviews'], grouped.size())
+    np.testing.assert_allclose(per_app['polarity_mean'], grouped['Sentiment_Polarity'].mean())
+    np.testing.assert_array_equal(per_app['Positive'], [1, 0])
+    for col in ['reviews', 'Positive', 'Neutral', 'Negative']:
+        assert per_app[col].dtype == np.int64
+
+
+def test_empty_reviews_table_has_integer_counts(tmp_path):
+    per_app = SnapshotState(str(tmp_path)).reviews.per_app()
+    assert per_app['reviews'].dtype == np.int64
+    assert per_app['polarity_mean'].dtype == np.float64
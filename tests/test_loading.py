@@ -0,0 +1,83 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from playstore import loading
+from playstore.loading import APPS_SCHEMA, cache_path, load_apps, load_csv, source_digest
+
+from conftest import APPS_CSV
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def apps_copy(tmp_path):
+    path = tmp_path / 'apps.csv'
+    shutil.copy(APPS_CSV, path)
+    return str(path)
+
+
+def test_miss_writes_cache_and_hit_reads_it(apps_copy, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / 'cache')
+    parsed = load_apps(apps_copy, cache_dir=cache_dir)
+    target = cache_path(apps_copy, APPS_SCHEMA, cache_dir)
+    assert os.path.exists(target)
+    pd.testing.assert_frame_equal(parsed, load_apps(APPS_CSV, use_cache=False))
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError('the CSV was parsed on a cache hit')
+
+    monkeypatch.setattr(loading, 'read_typed_csv', no_parse)
+    cached = load_apps(apps_copy, cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(cached, parsed)
+
+
+def test_schema_change_misses(apps_copy, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    schema = dict(APPS_SCHEMA, Reviews='float64')
+    assert cache_path(apps_copy, schema, cache_dir) != cache_path(apps_copy, APPS_SCHEMA,
+                                                                  cache_dir)
+    assert load_csv(apps_copy, schema, cache_dir=cache_dir)['Reviews'].dtype == np.float64
+
+
+def test_digest_stamp_is_reused(apps_copy, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / 'cache')
+    digest = source_digest(apps_copy, cache_dir)
+    assert os.path.exists(os.path.join(cache_dir, 'apps.digest.json'))
+
+    calls = []
+    monkeypatch.setattr(loading, 'file_digest', lambda path: calls.append(path))
+    assert source_digest(apps_copy, cache_dir) == digest
+    assert calls == []
+
+
+def test_edited_source_misses(apps_copy, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    before = load_apps(apps_copy, cache_dir=cache_dir)
+    old_target = cache_path(apps_copy, APPS_SCHEMA, cache_dir)
+    with open(apps_copy) as f:
+        lines = f.readlines()
+    with open(apps_copy, 'w') as f:
+        f.writelines(lines[:-1])
+
+    assert source_digest(apps_copy, cache_dir) == loading.file_digest(apps_copy)
+    assert cache_path(apps_copy, APPS_SCHEMA, cache_dir) != old_target
+    assert len(load_apps(apps_copy, cache_dir=cache_dir)) == len(before) - 1
+
+
+def test_arrow_backend_shares_cache_buffers(apps_copy, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    numpy_frame = load_apps(apps_copy, cache_dir=cache_dir)
+    for _ in range(2):  # the miss and the hit
+        frame = load_apps(apps_copy, cache_dir=cache_dir, dtype_backend='pyarrow')
+        assert isinstance(frame['Rating'].dtype, pd.ArrowDtype)
+        assert isinstance(frame['Category'].dtype, pd.CategoricalDtype)
+        assert frame['App'].dtype == numpy_frame['App'].dtype
+        for col in ['Rating', 'Reviews', 'Size']:
+            np.testing.assert_array_equal(frame[col].to_numpy(dtype=np.float64, na_value=np.nan),
+                                          numpy_frame[col].to_numpy(dtype=np.float64))
+    with pytest.raises(ValueError):
+        load_apps(apps_copy, cache_dir=cache_dir, dtype_backend='numpy')
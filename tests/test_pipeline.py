@@ -0,0 +1,85 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from playstore import loading, pipeline
+from playstore.pipeline import STAGES, Pipeline, Stage
+
+from conftest import APPS_CSV
+
+
+@pytest.fixture
+def paths(tmp_path):
+    apps_path = tmp_path / 'apps.csv'
+    shutil.copy(APPS_CSV, apps_path)
+    reviews_path = tmp_path / 'user_reviews.csv'
+    pd.DataFrame({'App': ['Photo Editor & Candy Camera & Grid & ScrapBook'],
+                  'Review': ['great'], 'Sentiment': ['Positive'],
+                  'Sentiment_Polarity': [0.8], 'Sentiment_Subjectivity': [0.75]}
+                 ).to_csv(reviews_path, index=False)
+    return str(apps_path), str(reviews_path)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Stage names in the order their functions run."""
+    calls = []
+    for name, stage in list(STAGES.items()):
+        def func(pipeline, *args, _func=stage.func, _name=name):
+            calls.append(_name)
+            return _func(pipeline, *args)
+        monkeypatch.setitem(STAGES, name, Stage(name, func, stage.deps, stage.source))
+    return calls
+
+
+def test_stage_runs_only_its_inputs_once(paths, calls):
+    run = Pipeline(*paths, cache_dir=None)
+    stats = run.get('category_stats')
+    assert calls == ['load', 'dedup', 'clean', 'typecast', 'category_stats']
+    assert run.get('category_stats') is stats
+    run.get('pricing')
+    assert calls[5:] == ['pricing']
+
+
+def test_disk_cache_skips_every_input(paths, calls, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    first = Pipeline(*paths, cache_dir=cache_dir).get('rating_distribution')
+    del calls[:]
+    again = Pipeline(*paths, cache_dir=cache_dir).get('rating_distribution')
+    assert calls == []
+    assert again['avg_app_rating'] == first['avg_app_rating']
+
+
+def test_load_stage_uses_cache_dir(paths, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    Pipeline(*paths, cache_dir=cache_dir).get('load')
+    assert any(name.endswith('.arrow') for name in os.listdir(cache_dir))
+    assert not os.path.exists(os.path.join(os.path.dirname(paths[0]), loading.CACHE_DIR))
+
+
+def test_keys_reuse_digest_stamp(paths, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / 'cache')
+    key = Pipeline(*paths, cache_dir=cache_dir).key('pricing')
+    hashed = []
+    monkeypatch.setattr(loading, 'file_digest', lambda path: hashed.append(path))
+    monkeypatch.setattr(pipeline, 'file_digest', lambda path: hashed.append(path))
+    assert Pipeline(*paths, cache_dir=cache_dir).key('pricing') == key
+    assert hashed == []
+
+
+def test_edited_input_invalidates_dependent_keys(paths, tmp_path, calls):
+    cache_dir = str(tmp_path / 'cache')
+    before = Pipeline(*paths, cache_dir=cache_dir)
+    keys = {name: before.key(name) for name in STAGES}
+    before.get('category_stats')
+    apps = pd.read_csv(paths[0])
+    apps.iloc[:-50].to_csv(paths[0], index=False)
+
+    after = Pipeline(*paths, cache_dir=cache_dir)
+    changed = {name for name in STAGES if after.key(name) != keys[name]}
+    assert changed == set(STAGES) - {'reviews'}
+    del calls[:]
+    assert after.get('category_stats').counts().sum() == len(apps) - 50
+    assert calls == ['load', 'dedup', 'clean', 'typecast', 'category_stats']
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from playstore.plots import MAX_POINTS, draw_density, jointplot, stratified_sample, stripplot
+
+
+@pytest.fixture
+def large_apps(apps):
+    """apps repeated until there are more rows than MAX_POINTS."""
+    repeats = MAX_POINTS // len(apps) + 2
+    return pd.concat([apps] * repeats, ignore_index=True)
+
+
+@pytest.fixture
+def pyplot():
+    matplotlib = pytest.importorskip('matplotlib')
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    yield plt
+    plt.close('all')
+
+
+def test_small_frame_is_returned_whole(apps):
+    assert stratified_sample(apps, 'Category', len(apps)) is apps
+
+
+def test_sample_size_and_shares(large_apps):
+    n = 20_000
+    sample = stratified_sample(large_apps, 'Category', n)
+    assert abs(len(sample) - n) < 0.05 * n
+    assert set(sample['Category']) == set(large_apps['Category'])
+    share = sample['Category'].value_counts() / large_apps['Category'].value_counts()
+    big = large_apps['Category'].value_counts() >= 1000
+    np.testing.assert_allclose(share[big], n / len(large_apps), rtol=0.25)
+
+
+def test_sample_is_reproducible(large_apps):
+    first = stratified_sample(large_apps, 'Category', 1000, seed=3)
+    again = stratified_sample(large_apps, 'Category', 1000, seed=3)
+    pd.testing.assert_frame_equal(first, again)
+
+
+def test_keep_rows_are_always_sampled(large_apps):
+    keep = (large_apps['Price'] > 200).to_numpy()
+    assert keep.any()
+    sample = stratified_sample(large_apps, 'Category', 1000, keep=keep)
+    assert set(np.flatnonzero(keep)) <= set(sample.index)
+    assert len(sample) < len(large_apps) // 10
+
+
+def test_density_switches_to_hexbin(pyplot):
+    from matplotlib.collections import PathCollection, PolyCollection
+
+    rng = np.random.default_rng(0)
+    for n, artist in [(MAX_POINTS, PathCollection), (MAX_POINTS + 1, PolyCollection)]:
+        _, ax = pyplot.subplots()
+        draw_density(rng.random(n), rng.random(n), ax=ax)
+        assert len(ax.collections) == 1
+        assert type(ax.collections[0]) is artist
+        if artist is PathCollection:
+            assert len(ax.collections[0].get_offsets()) == n
+
+
+def test_jointplot_above_threshold_has_no_point_artists(large_apps, pyplot):
+    pytest.importorskip('seaborn')
+    from matplotlib.collections import PolyCollection
+
+    size, rating = large_apps['Size'], large_apps['Rating']
+    present = int((size.notna() & rating.notna()).sum())
+    assert present < len(large_apps)
+
+    grid = jointplot(size, rating, max_points=present - 1)
+    hexbin, = grid.ax_joint.collections
+    assert type(hexbin) is PolyCollection
+    assert len(grid.ax_marg_x.patches) == len(grid.ax_marg_y.patches) == 1
+
+    # Missing pairs are not drawn, so they do not count towards the threshold
+    grid = jointplot(size, rating, max_points=present)
+    points, = grid.ax_joint.collections
+    assert len(points.get_offsets()) == present
+
+
+def test_stripplot_draws_sample_and_keep_rows(large_apps, pyplot):
+    pytest.importorskip('seaborn')
+    keep = (large_apps['Price'] > 200).to_numpy()
+    ax = stripplot(large_apps, 'Price', 'Category', max_points=2000, keep=keep)
+    drawn = sum(len(points.get_offsets()) for points in ax.collections)
+    assert keep.sum() <= drawn < 3000
@@ -0,0 +1,131 @@
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+from playstore.query import LIMIT, LocalClient, QueryError, QueryService, serve
+
+POPULAR = ['GAME', 'FAMILY', 'PHOTOGRAPHY', 'MEDICAL', 'TOOLS', 'FINANCE',
+           'LIFESTYLE', 'BUSINESS']
+
+
+@pytest.fixture(scope='module')
+def service(apps):
+    return QueryService(apps)
+
+
+@pytest.fixture
+def client(service):
+    return LocalClient(service)
+
+
+def test_apps_per_category(client, apps):
+    expected = apps['Category'].astype(str).value_counts().to_dict()
+    assert client.query('apps_per_category') == expected
+
+
+def test_average_rating(client, apps):
+    assert client.query('average_rating') == pytest.approx(apps['Rating'].mean())
+
+
+def test_expensive_apps(client, apps):
+    expected = apps[apps['Price'] > 200]
+    answer = client.query('range', column='Price', low=200, include_low=False)
+    assert answer['count'] == len(expected)
+    assert sorted(app['App'] for app in answer['apps']) == sorted(expected['App'])
+    prices = [app['Price'] for app in answer['apps']]
+    assert prices == sorted(prices)
+
+
+def test_range_in_categories(client, apps):
+    mask = apps['Category'].isin(POPULAR) & (apps['Price'] < 100)
+    answer = client.query('range', column='Price', high=100, include_high=False,
+                          category=POPULAR, limit=20)
+    assert answer['count'] == mask.sum()
+    assert len(answer['apps']) == 20
+    cheapest = np.sort(apps.loc[mask, 'Price'].to_numpy())[:20]
+    np.testing.assert_array_equal([app['Price'] for app in answer['apps']], cheapest)
+
+
+def test_top(client, apps):
+    answer = client.query('top', column='Rating', k=5, category='MEDICAL')
+    medical = apps.loc[apps['Category'] == 'MEDICAL', 'Rating'].dropna()
+    assert [app['Rating'] for app in answer] == list(medical.nlargest(5))
+    assert all(app['Category'] == 'MEDICAL' for app in answer)
+
+
+def test_large_categories(client, apps):
+    present = apps.dropna(subset=['Rating', 'Size'])
+    counts = present['Category'].astype(str).value_counts()
+    assert set(client.query('large_categories', min_count=250)) == set(counts[counts >= 250].index)
+
+
+def test_category_summary(client, apps):
+    game = apps[apps['Category'] == 'GAME']
+    summary = client.query('category_summary', category='GAME')
+    assert summary['count'] == len(game)
+    assert summary['Rating_mean'] == pytest.approx(game['Rating'].mean())
+
+
+@pytest.mark.parametrize('op, params', [
+    ('no_such_op', {}),
+    ('range', {'column': 'Reviews'}),
+    ('range', {'column': 'Price', 'low': 'abc'}),
+    ('range', {'column': 'Price', 'category': 'NO_SUCH_CATEGORY'}),
+    ('top', {'column': 'Rating', 'category': ['GAME', 'NO_SUCH_CATEGORY']}),
+    ('top', {'column': 'Rating', 'bogus': 1}),
+    ('category_summary', {'category': 'NO_SUCH_CATEGORY'}),
+    ('top', {'column': 'Rating', 'k': -5}),
+    ('top', {'column': 'Rating', 'k': 2.5}),
+    ('range', {'column': 'Price', 'limit': -1}),
+    ('range', {'column': 'Price', 'limit': '10'}),
+])
+def test_bad_requests_raise_query_error(client, op, params):
+    with pytest.raises(QueryError):
+        client.query(op, **params)
+
+
+def test_counts_are_capped_at_limit(client, apps):
+    for category in [None, 'GAME']:
+        params = {} if category is None else {'category': category}
+        assert len(client.query('top', column='Rating', k=10**9, **params)) == LIMIT
+        answer = client.query('range', column='Rating', limit=10**9, **params)
+        assert len(answer['apps']) == LIMIT
+        assert answer['count'] > LIMIT
+        assert client.query('top', column='Rating', k=0, **params) == []
+
+
+def test_records_keep_column_types(service, apps):
+    for col in ['Price', 'Rating', 'Category', 'Last Updated']:
+        assert service._values[col].dtype == apps[col].array.dtype
+    record, = service.top('Price', k=1, columns=['App', 'Price', 'Last Updated', 'Type'])
+    row = apps.loc[apps['Price'].idxmax()]
+    assert record == {'App': row['App'], 'Price': row['Price'],
+                      'Last Updated': row['Last Updated'].isoformat(), 'Type': row['Type']}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_server_answers_bad_parameters_with_400(service):
+    port = free_port()
+    threading.Thread(target=serve, args=(service, '127.0.0.1', port), daemon=True).start()
+    url = f'http://127.0.0.1:{port}/query?'
+    for _ in range(50):
+        try:
+            urllib.request.urlopen(url + 'op=average_rating')
+            break
+        except urllib.error.URLError:
+            time.sleep(0.1)
+    for query in ['op=range&column=Price&low=abc', 'op=top&column=Rating&category=NOPE',
+                  'op=top&column=Rating&largest=maybe']:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(url + query)
+        assert error.value.code == 400
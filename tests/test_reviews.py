@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from playstore.reviews import REQUIRED, AppIndex, GroupedMoments, iter_merged, stream_reviews
+
+SENTIMENTS = np.array(['Positive', 'Neutral', 'Negative', None], dtype=object)
+
+
+@pytest.fixture
+def repeated_apps(apps):
+    """apps with 40 app names listed twice, as in the store dump before cleaning."""
+    again = apps.iloc[:40].assign(Rating=apps['Rating'].iloc[:40] / 2)
+    return pd.concat([apps, again], ignore_index=True)
+
+
+@pytest.fixture
+def reviews_path(repeated_apps, tmp_path):
+    """A small user_reviews.csv about repeated, unique and unknown app names."""
+    rng = np.random.default_rng(0)
+    apps = repeated_apps
+    names = apps['App'].to_numpy()
+    repeated = apps['App'][apps['App'].duplicated()].unique()
+    picked = np.concatenate([rng.choice(names, 300), np.repeat(repeated[:20], 5),
+                             ['No such app'] * 10])
+    rng.shuffle(picked)
+    n = len(picked)
+    reviews = pd.DataFrame({
+        'App': picked,
+        'Review': np.where(rng.random(n) < 0.1, None, 'fine app'),
+        'Sentiment': SENTIMENTS[rng.integers(0, len(SENTIMENTS), n)],
+        'Sentiment_Polarity': rng.uniform(-1, 1, n).round(3),
+        'Sentiment_Subjectivity': rng.uniform(0, 1, n).round(3),
+    })
+    path = tmp_path / 'user_reviews.csv'
+    reviews.to_csv(path, index=False)
+    return str(path)
+
+
+def notebook_merge(apps, reviews_path):
+    reviews = pd.read_csv(reviews_path)
+    merged = pd.merge(apps, reviews, on='App', how='inner')
+    return merged.dropna(subset=REQUIRED)
+
+
+def sorted_rows(frame, columns):
+    frame = frame[columns].astype({'Sentiment': str, 'Category': str})
+    return frame.sort_values(columns, kind='stable').reset_index(drop=True)
+
+
+@pytest.mark.parametrize('chunksize', [7, 1000])
+def test_iter_merged_matches_merge(repeated_apps, reviews_path, chunksize):
+    apps = repeated_apps
+    assert not AppIndex(apps).index.is_unique
+    expected = notebook_merge(apps, reviews_path)
+    merged = pd.concat(iter_merged(apps, reviews_path, chunksize=chunksize))
+    assert len(merged) == len(expected)
+    columns = ['App', 'Category', 'Rating', 'Sentiment', 'Sentiment_Polarity',
+               'Sentiment_Subjectivity']
+    pd.testing.assert_frame_equal(sorted_rows(merged, columns), sorted_rows(expected, columns))
+
+
+def test_join_with_unique_names(apps):
+    unique = apps
+    index = AppIndex(unique, ['Category'])
+    assert index.index.is_unique
+    reviews = pd.DataFrame({'App': [unique['App'].iloc[3], 'No such app',
+                                    unique['App'].iloc[0], unique['App'].iloc[3]]})
+    joined = index.join(reviews)
+    expected = pd.merge(reviews, unique[['App', 'Category']], on='App', how='inner')
+    assert list(joined.columns) == ['App', 'Category']
+    np.testing.assert_array_equal(joined['App'], expected['App'])
+    np.testing.assert_array_equal(joined['Category'].astype(str), expected['Category'].astype(str))
+
+
+def test_join_keeps_review_order_with_repeated_names(repeated_apps):
+    apps = repeated_apps
+    name = apps['App'][apps['App'].duplicated()].iloc[0]
+    index = AppIndex(apps, ['Rating'])
+    reviews = pd.DataFrame({'App': ['No such app', name, apps['App'].iloc[0]],
+                            'n': [0, 1, 2]})
+    joined = index.join(reviews)
+    expected = pd.merge(reviews, apps[['App', 'Rating']], on='App', how='inner')
+    np.testing.assert_array_equal(joined['n'], expected['n'])
+    np.testing.assert_array_equal(joined['Rating'], expected['Rating'])
+
+
+def test_stream_reviews_matches_groupby(repeated_apps, reviews_path):
+    apps = repeated_apps
+    expected = notebook_merge(apps, reviews_path)
+    moments, = stream_reviews(apps, [GroupedMoments('Type', 'Sentiment_Polarity')],
+                              path=reviews_path, chunksize=50)
+    result = moments.result()
+    grouped = expected.groupby(expected['Type'].astype(str))['Sentiment_Polarity']
+    result.index = result.index.astype(str)
+    np.testing.assert_array_equal(result['count'], grouped.count().loc[result.index])
+    np.testing.assert_allclose(result['mean'], grouped.mean().loc[result.index])
+    np.testing.assert_allclose(result['std'], grouped.std(ddof=0).loc[result.index])
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from playstore import sentiment
+from playstore.pipeline import Pipeline
+from playstore.sentiment import (ScoreCache, app_sentiment, category_sentiment, score_file,
+                                 score_reviews, score_text, text_hashes)
+
+from conftest import APPS_CSV
+
+
+@pytest.fixture
+def reviews(apps):
+    """Reviews of five apps, with repeated texts and reviews without text."""
+    texts = ['I love this app', 'not good at all', 'very bad', 'it opens', None,
+             'great great great', 'I love this app']
+    names = apps['App'].iloc[:5].to_numpy()
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'App': names[rng.integers(0, len(names), 70)],
+                         'Review': [texts[i % len(texts)] for i in range(70)]})
+
+
+@pytest.fixture
+def scored_calls(monkeypatch):
+    """Lists of the texts handed to the scorer, one per batch."""
+    calls = []
+    score_batch = sentiment.score_batch
+
+    def counted(texts, lexicon=sentiment.LEXICON):
+        calls.append(list(texts))
+        return score_batch(texts, lexicon)
+
+    monkeypatch.setattr(sentiment, 'score_batch', counted)
+    return calls
+
+
+def test_score_text_rules():
+    assert score_text('good') == (0.7, 1.0)
+    assert score_text('not good')[0] == pytest.approx(-0.7)
+    assert score_text('very good')[0] == pytest.approx(0.91)
+    assert score_text('extremely perfect')[0] == 1.0
+    assert score_text('it opens') == (0.0, 0.0)
+    assert score_text('') == (0.0, 0.0)
+
+
+def test_score_reviews_matches_score_text(reviews, scored_calls):
+    scored = score_reviews(reviews, batch_size=2)
+    expected = reviews.dropna(subset=['Review'])
+    assert scored.index.equals(expected.index)
+    for text, polarity, label in zip(scored['Review'], scored['Sentiment_Polarity'],
+                                     scored['Sentiment']):
+        assert polarity == score_text(text)[0]
+        assert label == ('Positive' if polarity > 0 else
+                         'Negative' if polarity < 0 else 'Neutral')
+    # Every distinct text is scored once
+    texts = [text for batch in scored_calls for text in batch]
+    assert sorted(texts) == sorted(expected['Review'].unique())
+
+
+def test_cache_is_reused_across_runs(reviews, tmp_path, scored_calls):
+    cache = ScoreCache(str(tmp_path))
+    first = score_reviews(reviews, cache=cache)
+    cache.save()
+    del scored_calls[:]
+    again = score_reviews(reviews, cache=ScoreCache(str(tmp_path)))
+    assert scored_calls == []
+    pd.testing.assert_frame_equal(again, first)
+
+    extra = pd.DataFrame({'App': ['x', 'x'], 'Review': ['so good', 'I love this app']})
+    score_reviews(extra, cache=ScoreCache(str(tmp_path)))
+    assert scored_calls == [['so good']]
+
+
+def test_other_lexicon_starts_empty(reviews, tmp_path):
+    cache = ScoreCache(str(tmp_path))
+    score_reviews(reviews, cache=cache)
+    cache.save()
+    assert len(ScoreCache(str(tmp_path), lexicon={'good': 1.0})) == 0
+
+
+def test_cache_keeps_runs_until_save(tmp_path):
+    rng = np.random.default_rng(0)
+    cache = ScoreCache(str(tmp_path), max_runs=2)
+    hashes = rng.integers(0, 2**63, 500, dtype=np.uint64)
+    polarity = rng.uniform(-1, 1, 500)
+    for part in np.array_split(np.arange(500), 5):
+        cache.add(hashes[part], polarity[part], polarity[part] / 2)
+    assert len(cache.hashes) == 0 and len(cache.pending) <= 2
+    found, result, _ = cache.lookup(hashes)
+    assert found.all()
+    np.testing.assert_array_equal(result, polarity)
+    # A hash added again keeps the score it had
+    cache.add(hashes[:3], np.zeros(3), np.zeros(3))
+    cache.save()
+    saved = ScoreCache(str(tmp_path))
+    assert len(saved) == 500 and np.all(np.diff(saved.hashes.astype(np.float64)) >= 0)
+    np.testing.assert_array_equal(saved.lookup(hashes)[1], polarity)
+    assert not saved.lookup(text_hashes(['never seen']))[0].any()
+
+
+def test_app_and_category_sentiment_match_groupby(apps, reviews):
+    scored = score_reviews(reviews)
+    per_app = app_sentiment(scored)
+    grouped = scored.groupby('App')
+    np.testing.assert_array_equal(per_app['reviews'], grouped.size().loc[per_app.index])
+    np.testing.assert_allclose(per_app['polarity_mean'],
+                               grouped['Sentiment_Polarity'].mean().loc[per_app.index])
+    for label in ['Positive', 'Neutral', 'Negative']:
+        counts = (scored['Sentiment'] == label).groupby(scored['App']).sum()
+        np.testing.assert_array_equal(per_app[label], counts.loc[per_app.index])
+
+    merged = scored.merge(apps[['App', 'Category']], on='App')
+    per_category = category_sentiment(per_app, apps)
+    expected = merged.groupby('Category', observed=True)['Sentiment_Polarity'].mean()
+    np.testing.assert_allclose(per_category['polarity_mean'], expected.loc[per_category.index])
+
+
+def test_empty_input(tmp_path):
+    no_text = pd.DataFrame({'App': ['a', 'b'], 'Review': [None, None]})
+    scored = score_reviews(no_text, cache=ScoreCache(str(tmp_path)))
+    assert len(scored) == 0
+    per_app = app_sentiment(scored)
+    assert len(per_app) == 0 and 'polarity_mean' in per_app.columns
+    path = tmp_path / 'reviews.csv'
+    no_text.to_csv(path, index=False)
+    assert len(score_file(str(path), cache_dir=str(tmp_path), processes=1)) == 0
+
+
+def test_score_file_matches_one_pass(reviews, tmp_path):
+    path = tmp_path / 'reviews.csv'
+    reviews.to_csv(path, index=False)
+    per_app = score_file(str(path), cache_dir=str(tmp_path), processes=2, chunksize=16,
+                         batch_size=3)
+    pd.testing.assert_frame_equal(per_app, app_sentiment(score_reviews(reviews)),
+                                  check_like=True)
+
+
+def test_review_sentiment_stage(apps, reviews, tmp_path):
+    path = tmp_path / 'user_reviews.csv'
+    reviews.to_csv(path, index=False)
+    result = Pipeline(APPS_CSV, str(path), cache_dir=str(tmp_path / 'cache')).get(
+        'review_sentiment')
+    expected = app_sentiment(score_reviews(reviews))
+    pd.testing.assert_frame_equal(result['per_app'], expected, check_like=True)
+    joined = apps.join(result['per_app'], on='App', how='inner')
+    assert len(joined) == len(expected)
+    assert set(result['per_category'].index) == set(joined['Category'])
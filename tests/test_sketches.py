@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from playstore.sketches import (Histogram, QuantileSketch, box_stats, installs_by_type,
+                                rating_histogram)
+
+
+def test_rating_histogram_counts_every_rating(apps):
+    ratings = apps['Rating'].dropna()
+    hist = rating_histogram().update(apps['Rating'])
+    assert hist.count == len(ratings)
+    assert abs(hist.quantiles(0.5)[0] - ratings.median()) < 0.1
+
+
+def test_quantile_sketch_rank_error():
+    values = np.random.default_rng(0).lognormal(10, 2, 200_000)
+    sketch = QuantileSketch(k=512, seed=0)
+    for chunk in np.array_split(values, 20):
+        sketch.update(chunk)
+    q = np.linspace(0.05, 0.95, 19)
+    ranks = np.searchsorted(np.sort(values), sketch.quantiles(q)) / len(values)
+    assert np.abs(ranks - q).max() < 0.02
+    assert sketch.quantiles([0.0, 1.0]).tolist() == [values.min(), values.max()]
+
+
+def test_merged_histograms_equal_one_pass():
+    values = np.random.default_rng(1).normal(0, 0.4, 10_000)
+    whole = Histogram.linear(-1, 1, 200).update(values)
+    merged = Histogram.linear(-1, 1, 200).update(values[:3000]).merge(
+        Histogram.linear(-1, 1, 200).update(values[3000:]))
+    np.testing.assert_array_equal(merged.counts, whole.counts)
+    assert (merged.min, merged.max) == (whole.min, whole.max)
+
+
+def test_box_stats_match_matplotlib_on_installs(apps):
+    cbook = pytest.importorskip('matplotlib.cbook')
+    grouped = installs_by_type().update(apps)
+    for name in ['Paid', 'Free']:
+        values = apps.loc[apps['Type'] == name, 'Installs'].dropna().to_numpy()
+        expected = cbook.boxplot_stats(values)[0]
+        stats = box_stats(grouped.summaries[name])
+        assert (stats['whislo'], stats['whishi']) == (expected['whislo'], expected['whishi'])
+        np.testing.assert_array_equal(stats['fliers'], np.unique(expected['fliers']))
+
+
+def test_installs_sketch_is_reproducible(apps):
+    first = box_stats(installs_by_type().update(apps).summaries['Free'])
+    second = box_stats(installs_by_type().update(apps).summaries['Free'])
+    assert first['med'] == second['med']
+    np.testing.assert_array_equal(first['fliers'], second['fliers'])